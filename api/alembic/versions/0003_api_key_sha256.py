@@ -0,0 +1,37 @@
+"""Add api_keys.key_sha256 for single-hash key lookup.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "api_keys",
+        sa.Column(
+            "key_sha256",
+            sa.LargeBinary(32),
+            nullable=True,
+            comment="HMAC-SHA256 of the raw key; NULL for legacy PBKDF2-only keys",
+        ),
+    )
+    op.create_index("ix_api_keys_key_sha256", "api_keys", ["key_sha256"], unique=True)
+    # New keys no longer carry a PBKDF2 hash
+    op.alter_column("api_keys", "key_hash", existing_type=sa.String(255), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM api_keys WHERE key_hash IS NULL")
+    op.alter_column("api_keys", "key_hash", existing_type=sa.String(255), nullable=False)
+    op.drop_index("ix_api_keys_key_sha256", table_name="api_keys")
+    op.drop_column("api_keys", "key_sha256")
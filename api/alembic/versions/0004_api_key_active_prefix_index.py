@@ -0,0 +1,31 @@
+"""Index api_keys on (is_active, key_prefix) and retire prefix-less keys.
+
+Keys without a key_prefix (and without a key_sha256 digest) could only be
+matched by scanning and PBKDF2-verifying every such row. The prefix cannot
+be recovered from the hash, so these keys are deactivated and must be
+re-issued.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_api_keys_active_prefix", "api_keys", ["is_active", "key_prefix"])
+    op.execute(
+        "UPDATE api_keys SET is_active = false "
+        "WHERE key_prefix IS NULL AND key_sha256 IS NULL AND is_active"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_keys_active_prefix", table_name="api_keys")
@@ -0,0 +1,27 @@
+"""Make api_keys.key_prefix unique.
+
+Prefixes are cut from a 256-bit random token, so collisions are
+astronomically unlikely; a unique index lets lookups return at most one row.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_api_keys_key_prefix", table_name="api_keys")
+    op.create_index("ix_api_keys_key_prefix", "api_keys", ["key_prefix"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_keys_key_prefix", table_name="api_keys")
+    op.create_index("ix_api_keys_key_prefix", "api_keys", ["key_prefix"])
@@ -0,0 +1,47 @@
+"""Partial indexes for active email provider lookups.
+
+The resolver looks up the active provider for an inbox and the active global
+provider (inbox_id IS NULL). Both predicates get a matching partial index, and
+the global one is unique so at most one global provider can be active.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the newest active global provider before enforcing uniqueness
+    op.execute(
+        "UPDATE email_providers SET is_active = false "
+        "WHERE inbox_id IS NULL AND is_active AND id NOT IN ("
+        "SELECT id FROM email_providers WHERE inbox_id IS NULL AND is_active "
+        "ORDER BY created_at DESC LIMIT 1)"
+    )
+    op.create_index(
+        "ix_email_providers_active_inbox",
+        "email_providers",
+        ["inbox_id"],
+        postgresql_where=sa.text("is_active"),
+    )
+    op.create_index(
+        "ix_email_providers_active_global",
+        "email_providers",
+        [sa.text("(inbox_id IS NULL)")],
+        unique=True,
+        postgresql_where=sa.text("inbox_id IS NULL AND is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_providers_active_global", table_name="email_providers")
+    op.drop_index("ix_email_providers_active_inbox", table_name="email_providers")
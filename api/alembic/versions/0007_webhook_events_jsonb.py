@@ -0,0 +1,43 @@
+"""Store webhook event body/headers as JSONB.
+
+jsonb cannot hold the NUL character, which json accepted as a \\u0000 escape,
+so existing values have those escapes stripped on the way over (an escaped
+backslash followed by "u0000" is left alone). New events are stripped at
+ingest (app.routers.webhooks).
+
+No GIN index is added: nothing queries the columns by containment, and every
+event insert would pay to maintain one.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# \u0000 escapes preceded by an even number of backslashes (i.e. real NULs)
+_STRIP_NUL = r"regexp_replace({0}::text, '(?<!\\)((?:\\\\)*)\\u0000', '\1', 'g')::jsonb"
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE webhook_events "
+        f"ALTER COLUMN body TYPE jsonb USING {_STRIP_NUL.format('body')}, "
+        f"ALTER COLUMN headers TYPE jsonb USING {_STRIP_NUL.format('headers')}, "
+        "ALTER COLUMN headers SET DEFAULT '{}'::jsonb"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE webhook_events "
+        "ALTER COLUMN body TYPE json USING body::json, "
+        "ALTER COLUMN headers TYPE json USING headers::json, "
+        "ALTER COLUMN headers SET DEFAULT '{}'::json"
+    )
@@ -0,0 +1,32 @@
+"""Index webhook_events on (inbox_id, received_at DESC).
+
+Event listing filters by inbox and orders by received_at descending; the
+composite index serves it as a range scan and makes the single-column
+inbox_id index redundant.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_webhook_events_inbox_received "
+            "ON webhook_events (inbox_id, received_at DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_webhook_events_inbox_id")
+
+
+def downgrade() -> None:
+    op.create_index("ix_webhook_events_inbox_id", "webhook_events", ["inbox_id"])
+    op.drop_index("ix_webhook_events_inbox_received", table_name="webhook_events")
@@ -0,0 +1,33 @@
+"""Make the active-key prefix index partial.
+
+Only active keys are ever looked up, so index key_prefix WHERE is_active
+instead of the (is_active, key_prefix) composite from 0004.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_api_keys_active_prefix", table_name="api_keys")
+    op.create_index(
+        "ix_api_keys_active_prefix",
+        "api_keys",
+        ["key_prefix"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_keys_active_prefix", table_name="api_keys")
+    op.create_index("ix_api_keys_active_prefix", "api_keys", ["is_active", "key_prefix"])
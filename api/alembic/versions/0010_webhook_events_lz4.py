@@ -0,0 +1,34 @@
+"""Compress large webhook event JSONB values with LZ4 instead of pglz.
+
+Every event insert compresses oversized body/headers values and every read
+decompresses them; LZ4 is considerably cheaper in both directions. Applies
+to newly written values (PostgreSQL 14+).
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE webhook_events "
+        "ALTER COLUMN body SET COMPRESSION lz4, "
+        "ALTER COLUMN headers SET COMPRESSION lz4"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE webhook_events "
+        "ALTER COLUMN body SET COMPRESSION pglz, "
+        "ALTER COLUMN headers SET COMPRESSION pglz"
+    )
@@ -0,0 +1,34 @@
+"""Add api_keys.scopes_bits, a bitmask mirror of the scopes array.
+
+Bits: admin = 1, webhooks = 2 (app.auth.SCOPE_BITS). The scopes array is kept
+for display.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "api_keys",
+        sa.Column("scopes_bits", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "UPDATE api_keys SET scopes_bits = "
+        "(CASE WHEN 'admin' = ANY(scopes) THEN 1 ELSE 0 END) | "
+        "(CASE WHEN 'webhooks' = ANY(scopes) THEN 2 ELSE 0 END)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("api_keys", "scopes_bits")
@@ -0,0 +1,33 @@
+"""Replace the webhook_inboxes slug index with a covering unique index.
+
+The unique slug index INCLUDEs id and is_active, so slug-to-id lookups become
+index-only scans. The unbounded text columns (forward_url, notify_email) are
+left out: they would risk the btree row-size limit on long values, and the
+receiver loads the whole inbox (through its cache) anyway.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_webhook_inboxes_slug_cover "
+            "ON webhook_inboxes (slug) INCLUDE (id, is_active)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_webhook_inboxes_slug")
+
+
+def downgrade() -> None:
+    op.create_index("ix_webhook_inboxes_slug", "webhook_inboxes", ["slug"], unique=True)
+    op.drop_index("ix_webhook_inboxes_slug_cover", table_name="webhook_inboxes")
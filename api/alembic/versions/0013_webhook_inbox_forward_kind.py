@@ -0,0 +1,33 @@
+"""Add webhook_inboxes.forward_kind, the legacy forward target classification.
+
+Set from forward_url when an inbox is created or updated ("discord", "slack"
+or "generic") so the receiver does not re-scan the URL on every webhook.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("webhook_inboxes", sa.Column("forward_kind", sa.String(20), nullable=True))
+    op.execute(
+        "UPDATE webhook_inboxes SET forward_kind = CASE "
+        "WHEN strpos(forward_url, 'discord.com/api/webhooks') > 0 THEN 'discord' "
+        "WHEN strpos(forward_url, 'hooks.slack.com/') > 0 THEN 'slack' "
+        "ELSE 'generic' END "
+        "WHERE forward_url IS NOT NULL AND forward_url <> ''"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_inboxes", "forward_kind")
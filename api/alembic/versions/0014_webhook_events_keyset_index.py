@@ -0,0 +1,36 @@
+"""Index webhook_events on (inbox_id, received_at DESC, id DESC).
+
+Keyset pagination of the event listing seeks on (received_at, id) within an
+inbox; adding id to the composite index lets each page start with an index
+seek. Replaces the (inbox_id, received_at DESC) index from 0008.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_webhook_events_inbox_received_id "
+            "ON webhook_events (inbox_id, received_at DESC, id DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_webhook_events_inbox_received")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_webhook_events_inbox_received "
+            "ON webhook_events (inbox_id, received_at DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_webhook_events_inbox_received_id")
@@ -0,0 +1,98 @@
+"""Range-partition webhook_events by month on received_at.
+
+Retention then drops whole expired monthly partitions instead of deleting
+rows one by one, and event listings by time window only touch the partitions
+they need. The primary key becomes (id, received_at), since a partitioned
+table's unique constraints must include the partition key.
+
+Partitions are named webhook_events_YYYY_MM. This migration creates them from
+the oldest stored event through two months ahead, plus a DEFAULT partition so
+an insert never fails for want of a partition; the worker keeps creating
+months ahead (app.worker.ensure_event_partitions).
+
+The table is rebuilt and its rows copied, so this runs with webhook_events
+locked: schedule it in a maintenance window on large installs.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = (
+    # Retention deletes by received_at in the partitions it can't drop whole
+    "CREATE INDEX ix_webhook_events_received_at ON webhook_events (received_at)",
+    "CREATE INDEX ix_webhook_events_inbox_received_id "
+    "ON webhook_events (inbox_id, received_at DESC, id DESC)",
+)
+
+
+def _rebuild(partitioned: bool) -> None:
+    partition_clause = " PARTITION BY RANGE (received_at)" if partitioned else ""
+    pk_columns = "id, received_at" if partitioned else "id"
+    op.execute(
+        "CREATE TABLE webhook_events_new (LIKE webhook_events "
+        f"INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMPRESSION){partition_clause}"
+    )
+    op.execute(
+        f"ALTER TABLE webhook_events_new ADD CONSTRAINT webhook_events_new_pkey "
+        f"PRIMARY KEY ({pk_columns})"
+    )
+    if partitioned:
+        op.execute(
+            """
+            DO $$
+            DECLARE
+                -- UTC months, as the worker uses, whatever the session TimeZone
+                month timestamp := date_trunc(
+                    'month',
+                    coalesce((SELECT min(received_at) FROM webhook_events), now())
+                    AT TIME ZONE 'UTC'
+                );
+                last_month timestamp :=
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '2 months';
+            BEGIN
+                WHILE month <= last_month LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF webhook_events_new '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        'webhook_events_' || to_char(month, 'YYYY_MM'),
+                        to_char(month, 'YYYY-MM-DD') || ' 00:00+00',
+                        to_char(month + interval '1 month', 'YYYY-MM-DD') || ' 00:00+00'
+                    );
+                    month := month + interval '1 month';
+                END LOOP;
+            END $$
+            """
+        )
+        op.execute("CREATE TABLE webhook_events_default PARTITION OF webhook_events_new DEFAULT")
+
+    op.execute("INSERT INTO webhook_events_new SELECT * FROM webhook_events")
+    op.execute("DROP TABLE webhook_events")
+    op.execute("ALTER TABLE webhook_events_new RENAME TO webhook_events")
+    op.execute(
+        "ALTER TABLE webhook_events RENAME CONSTRAINT webhook_events_new_pkey "
+        "TO webhook_events_pkey"
+    )
+    op.execute(
+        "ALTER TABLE webhook_events ADD CONSTRAINT webhook_events_inbox_id_fkey "
+        "FOREIGN KEY (inbox_id) REFERENCES webhook_inboxes (id) ON DELETE CASCADE"
+    )
+    for statement in _INDEXES:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    # Partitions are dropped along with the partitioned parent
+    _rebuild(partitioned=False)
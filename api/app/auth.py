@@ -1,22 +1,50 @@
+import hashlib
+import hmac
 import logging
 import secrets
 from datetime import datetime, timezone
+from typing import Optional
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Request, Security
 from fastapi.security import APIKeyHeader
 from passlib.hash import pbkdf2_sha256
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth_flush import record_key_use
 from app.config import settings
 from app.database import get_db
 from app.models.api_key import ApiKey
+from app.redis import incr_window
+from app.redis import redis as redis_client
 
 logger = logging.getLogger(__name__)
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-ALL_SCOPES = ["webhooks", "admin"]
+ALL_SCOPES = frozenset({"webhooks", "admin"})
+
+# Bit assigned to each scope in ApiKey.scopes_bits (append only: bits are stored)
+SCOPE_BITS = {
+    "admin": 1 << 0,
+    "webhooks": 1 << 1,
+}
+ALL_SCOPE_BITS = sum(SCOPE_BITS.values())
+
+
+def scope_bits(scopes) -> int:
+    """Pack scope names into the scopes_bits bitmask."""
+    bits = 0
+    for scope in scopes:
+        bits |= SCOPE_BITS[scope]
+    return bits
+
+
+# Recently verified DB keys by keyed hash. A revoked key stays usable on other
+# workers for at most _KEY_CACHE_TTL seconds.
+_KEY_CACHE_TTL = 30
+_key_cache: TTLCache = TTLCache(maxsize=4096, ttl=_KEY_CACHE_TTL)
 
 _LOCKOUT_THRESHOLD = 10
 _LOCKOUT_WINDOW = 300  # 5 minutes
@@ -32,53 +60,72 @@ def _get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-async def _check_lockout(ip: str) -> None:
-    from app.redis import redis as redis_client
+async def _check_lockout(ip: str) -> int:
+    """Raise 429 if the IP is locked out; return its current failure count.
 
+    This is the only Redis round trip on a successful authentication.
+    """
     try:
-        count = await redis_client.get(f"auth_fail:{ip}")
-        if count and int(count) >= _LOCKOUT_THRESHOLD:
-            raise HTTPException(
-                status_code=429,
-                detail="Too many failed authentication attempts. Try again later.",
-            )
-    except HTTPException:
-        raise
+        count = int(await redis_client.get(f"auth_fail:{ip}") or 0)
     except Exception:
-        pass
+        return 0
+    if count >= _LOCKOUT_THRESHOLD:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed authentication attempts. Try again later.",
+        )
+    return count
 
 
 async def _record_failure(ip: str) -> None:
-    from app.redis import redis as redis_client
-
+    # INCR and the window's EXPIRE in one atomic round trip
     try:
-        key = f"auth_fail:{ip}"
-        count = await redis_client.incr(key)
-        if count == 1:
-            await redis_client.expire(key, _LOCKOUT_WINDOW)
+        await incr_window(keys=[f"auth_fail:{ip}"], args=[_LOCKOUT_WINDOW])
     except Exception:
         pass
 
 
-async def _clear_failure(ip: str) -> None:
-    from app.redis import redis as redis_client
-
+async def _clear_failure(ip: str, failures: int) -> None:
+    # Only an IP with recorded failures has a counter to delete
+    if not failures:
+        return
     try:
         await redis_client.delete(f"auth_fail:{ip}")
     except Exception:
         pass
 
 
-def hash_key(key: str) -> str:
-    return pbkdf2_sha256.hash(key)
+_PEPPER = settings.api_key_pepper.encode()
+
+
+def hash_key(key: str) -> bytes:
+    # API keys carry 256 bits of entropy, so a single keyed hash is enough;
+    # key stretching would only add per-request CPU cost.
+    return hmac.new(_PEPPER, key.encode(), hashlib.sha256).digest()
+
+
+def verify_key(key: str, key_sha256: bytes) -> bool:
+    return hmac.compare_digest(hash_key(key), key_sha256)
 
 
-def verify_key(key: str, key_hash: str) -> bool:
+def verify_legacy_key(key: str, key_hash: str) -> bool:
     return pbkdf2_sha256.verify(key, key_hash)
 
 
-def generate_key() -> str:
-    return f"hf_{secrets.token_urlsafe(32)}"
+def forget_key(key_sha256: Optional[bytes]) -> None:
+    """Drop a key from this process's verification cache (e.g. on revoke)."""
+    if key_sha256:
+        _key_cache.pop(key_sha256, None)
+
+
+def generate_key() -> tuple[str, str]:
+    """Return a new raw API key and its display/lookup prefix.
+
+    The prefix is taken from the random token rather than the ``hf_`` marker,
+    so all 12 indexed characters carry entropy.
+    """
+    token = secrets.token_urlsafe(32)
+    return f"hf_{token}", token[:12]
 
 
 async def get_current_key(
@@ -89,51 +136,66 @@ async def get_current_key(
     if not api_key:
         raise HTTPException(status_code=401, detail="Missing API key")
 
+    # A key verified within the last few seconds skips Redis and the DB
+    key_sha256 = hash_key(api_key)
+    cached = _key_cache.get(key_sha256)
+    if cached is not None:
+        record_key_use(cached.id)
+        return cached
+
     client_ip = _get_client_ip(request)
-    await _check_lockout(client_ip)
+    failures = await _check_lockout(client_ip)
 
-    # Check admin key first (constant-time comparison)
-    if secrets.compare_digest(api_key, settings.admin_api_key):
-        await _clear_failure(client_ip)
+    # Check admin key first (constant-time comparison of equal-length digests)
+    incoming_sha256 = hashlib.sha256(api_key.encode()).digest()
+    if hmac.compare_digest(incoming_sha256, settings.admin_api_key_sha256):
+        await _clear_failure(client_ip, failures)
         admin = ApiKey(
             name="admin",
             key_hash="",
             scopes=ALL_SCOPES,
+            scopes_bits=ALL_SCOPE_BITS,
             is_active=True,
         )
         return admin
 
-    # Look up in DB by prefix
-    key_prefix = api_key[:12] if len(api_key) >= 12 else api_key
+    # Look up in DB by keyed hash (single indexed fetch)
+    result = await db.execute(
+        select(ApiKey).where(
+            ApiKey.is_active.is_(True),
+            ApiKey.key_sha256 == key_sha256,
+        )
+    )
+    db_key = result.scalar_one_or_none()
+    if db_key and verify_key(api_key, db_key.key_sha256):
+        await _clear_failure(client_ip, failures)
+        record_key_use(db_key.id)
+        _key_cache[key_sha256] = db_key
+        return db_key
+
+    # Legacy fallback: PBKDF2 keys issued before key_sha256 existed (their
+    # stored prefix is the first 12 characters of the full key, "hf_" included)
+    key_prefix = api_key[:12]
 
     result = await db.execute(
         select(ApiKey).where(
             ApiKey.is_active.is_(True),
+            ApiKey.key_sha256.is_(None),
             ApiKey.key_prefix == key_prefix,
         )
     )
-    keys = result.scalars().all()
-
-    if not keys:
-        result = await db.execute(
-            select(ApiKey).where(
-                ApiKey.is_active.is_(True),
-                ApiKey.key_prefix.is_(None),
-            )
+    db_key = result.scalar_one_or_none()
+
+    if db_key and db_key.key_hash and verify_legacy_key(api_key, db_key.key_hash):
+        await _clear_failure(client_ip, failures)
+        # Backfill the keyed hash so the next request takes the fast path
+        await db.execute(
+            update(ApiKey)
+            .where(ApiKey.id == db_key.id)
+            .values(last_used_at=datetime.now(timezone.utc), key_sha256=key_sha256)
         )
-        keys = result.scalars().all()
-
-    for db_key in keys:
-        if verify_key(api_key, db_key.key_hash):
-            await _clear_failure(client_ip)
-            updates = {"last_used_at": datetime.now(timezone.utc)}
-            if not db_key.key_prefix:
-                updates["key_prefix"] = key_prefix
-            await db.execute(
-                update(ApiKey).where(ApiKey.id == db_key.id).values(**updates)
-            )
-            await db.commit()
-            return db_key
+        await db.commit()
+        return db_key
 
     await _record_failure(client_ip)
     logger.warning("Failed auth attempt from %s", client_ip)
@@ -141,10 +203,11 @@ async def get_current_key(
 
 
 def require_scope(scope: str):
+    # admin satisfies every scope; an unregistered scope is admin-only
+    accepted = SCOPE_BITS["admin"] | SCOPE_BITS.get(scope, 0)
+
     async def checker(key: ApiKey = Depends(get_current_key)):
-        if "admin" in key.scopes:
-            return key
-        if scope not in key.scopes:
+        if not key.scopes_bits & accepted:
             raise HTTPException(
                 status_code=403, detail=f"Key lacks required scope: {scope}"
             )
@@ -0,0 +1,61 @@
+"""Deferred ``last_used_at`` writes for API keys.
+
+Successful authentications enqueue a usage record instead of committing an
+UPDATE on the request path; a lifespan-managed task flushes them in one
+batched statement every second.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import async_session
+from app.models.api_key import ApiKey
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 1  # seconds
+
+# Latest use per key since the last flush; repeated uses of a key overwrite
+# one entry, so memory is bounded by the number of distinct active keys
+_pending: dict[uuid.UUID, datetime] = {}
+
+
+def record_key_use(key_id: uuid.UUID) -> None:
+    """Queue a last_used_at update for the given key."""
+    _pending[key_id] = datetime.now(timezone.utc)
+
+
+async def flush_key_usage() -> int:
+    """Write all queued usage records in a single UPDATE. Returns rows written."""
+    global _pending
+    if not _pending:
+        return 0
+    latest, _pending = _pending, {}
+
+    vals = values(
+        column("id", UUID(as_uuid=True)),
+        column("used_at", DateTime(timezone=True)),
+        name="vals",
+    ).data(list(latest.items()))
+
+    async with async_session() as db:
+        await db.execute(
+            update(ApiKey).where(ApiKey.id == vals.c.id).values(last_used_at=vals.c.used_at)
+        )
+        await db.commit()
+    return len(latest)
+
+
+async def run_key_usage_flusher() -> None:
+    """Flush queued usage records every FLUSH_INTERVAL seconds until cancelled."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        try:
+            await flush_key_usage()
+        except Exception:
+            logger.exception("Failed to flush API key usage")
@@ -1,7 +1,18 @@
 """Base types for notification channel adapters."""
 
 from dataclasses import dataclass
-from typing import Optional
+
+# Sensitive/internal body keys that are never forwarded to channels
+SKIP_KEYS = frozenset({"cf-turnstile-response", "raw", "raw_truncated", "source"})
+
+
+def iter_fields(body: dict) -> list[tuple[str, object]]:
+    """Return the (key, value) pairs of a body worth showing: non-empty and not skipped."""
+    return [(k, v) for k, v in body.items() if v and k not in SKIP_KEYS]
+
+
+# Prefix of the hook path sent in X-Forwarded-From and shown in footers
+HOOK_PATH_PREFIX = "hookforms/hooks/"
 
 
 @dataclass
@@ -10,7 +21,7 @@ class ChannelPayload:
     method: str
     url: str
     headers: dict[str, str]
-    body: str  # JSON string or plain text
+    body: bytes  # Encoded request body (JSON or UTF-8 plain text)
 
 
 @dataclass
@@ -20,3 +31,5 @@ class ChannelContext:
     subject_prefix: str
     sender_name: str
     body: dict
+    timestamp: str  # ISO-8601 UTC time of the submission, shared by all channels
+    hook_path: str  # HOOK_PATH_PREFIX + slug, built once per dispatch
@@ -1,29 +1,36 @@
 """Auto-detection of channel type from URL."""
 
+import re
+
+# (needle, channel type) pairs, compiled into a single alternation so a URL
+# is scanned once instead of once per channel type.
+_CHANNEL_NEEDLES = (
+    ("discord.com/api/webhooks", "discord"),
+    ("hooks.slack.com/", "slack"),
+    ("webhook.office.com", "teams"),
+    ("logic.azure.com", "teams"),
+    ("api.telegram.org/bot", "telegram"),
+    ("ntfy.sh/", "ntfy"),
+)
+
+_CHANNEL_TYPE_BY_NEEDLE = {needle: channel for needle, channel in _CHANNEL_NEEDLES}
+
+_CHANNEL_RE = re.compile(
+    "|".join(re.escape(needle) for needle, _ in _CHANNEL_NEEDLES),
+    re.IGNORECASE,
+)
+
 
 def detect_channel_type(url: str) -> str:
     """
     Detect the channel type from a URL.
-    
+
     Returns:
         Channel type string: 'discord', 'slack', 'teams', 'telegram', 'ntfy', or 'webhook'
     """
-    url_lower = url.lower()
-    
-    if "discord.com/api/webhooks" in url_lower:
-        return "discord"
-    
-    if "hooks.slack.com/" in url_lower:
-        return "slack"
-    
-    if "webhook.office.com" in url_lower or "logic.azure.com" in url_lower:
-        return "teams"
-    
-    if "api.telegram.org/bot" in url_lower:
-        return "telegram"
-    
-    if "ntfy.sh/" in url_lower:
-        return "ntfy"
-    
+    match = _CHANNEL_RE.search(url)
+    if match:
+        return _CHANNEL_TYPE_BY_NEEDLE[match.group(0).lower()]
+
     # Default to generic webhook
     return "webhook"
@@ -1,24 +1,108 @@
 """Notification dispatcher for all channel types."""
 
 import asyncio
+import dataclasses
 import html as html_lib
 import logging
+from datetime import datetime, timezone
 from typing import Optional
 
-from app.channels import ChannelContext
+import orjson
+
+from app.channels import HOOK_PATH_PREFIX, ChannelContext, iter_fields
 from app.channels.detect import detect_channel_type
-from app.channels.format_value import format_value
 from app.channels.discord import format_discord
+from app.channels.format_value import format_value, pretty_label
+from app.channels.ntfy import format_ntfy
 from app.channels.slack import format_slack
 from app.channels.teams import format_teams
 from app.channels.telegram import format_telegram
-from app.channels.ntfy import format_ntfy
 from app.channels.webhook import format_webhook
 from app.providers.base import EmailProvider
-from app.security import safe_http_client
+from app.redis import window_exceeded
+from app.security import get_safe_client
 
 logger = logging.getLogger(__name__)
 
+# HTTP-based channel formatters; "email" is handled separately by the dispatcher
+_FORMATTERS = {
+    "discord": format_discord,
+    "slack": format_slack,
+    "teams": format_teams,
+    "telegram": format_telegram,
+    "ntfy": format_ntfy,
+    "webhook": format_webhook,
+}
+
+# Config key each formatter copies verbatim into ChannelPayload.url. Every other
+# config key may shape the body/headers, so it is part of the payload cache key.
+_URL_CONFIG_KEYS = {
+    "discord": "webhook_url",
+    "slack": "webhook_url",
+    "teams": "webhook_url",
+    "telegram": "bot_url",
+    "ntfy": "url",
+    "webhook": "url",
+}
+
+# --- Email HTML template (built once at import) ---
+
+_EMAIL_LABEL_STYLE = (
+    "padding:10px 14px;font-weight:600;color:#555;"
+    "white-space:nowrap;vertical-align:top;border-bottom:1px solid #eee;"
+)
+_EMAIL_VALUE_STYLE = "padding:10px 14px;color:#222;border-bottom:1px solid #eee;"
+
+_EMAIL_ROW_TEMPLATE = (
+    f'<tr><td style="{_EMAIL_LABEL_STYLE}">{{label}}</td>'
+    f'<td style="{_EMAIL_VALUE_STYLE}">{{value}}</td></tr>'
+)
+
+_EMAIL_REPLY_TEMPLATE = (
+    '<tr><td style="padding:0 32px 24px;"><a href="mailto:{email}" '
+    'style="display:inline-block;padding:10px 20px;background:#1a1a2e;color:#fff;'
+    'text-decoration:none;border-radius:5px;font-size:14px;">Reply to {name}</a></td></tr>'
+)
+
+# A trailing backslash joins a long line to the next without adding a newline
+_EMAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"></head>
+<body style="margin:0;padding:0;background:#f4f5f7;\
+font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Helvetica,Arial,sans-serif;">
+  <table width="100%" cellpadding="0" cellspacing="0" style="background:#f4f5f7;padding:32px 0;">
+    <tr><td align="center">
+      <table width="600" cellpadding="0" cellspacing="0" style="background:#ffffff;\
+border-radius:8px;overflow:hidden;box-shadow:0 2px 8px rgba(0,0,0,0.08);">
+        <tr>
+          <td style="background:#1a1a2e;padding:24px 32px;">
+            <h1 style="margin:0;color:#ffffff;font-size:20px;font-weight:600;">{subject_detail}</h1>
+          </td>
+        </tr>
+        <tr>
+          <td style="padding:24px 32px;">
+            <p style="margin:0 0 16px;color:#666;font-size:14px;">\
+A new form submission was received:</p>
+            <table width="100%" cellpadding="0" cellspacing="0" style="border:1px solid #eee;\
+border-radius:6px;overflow:hidden;">
+              {field_rows}
+            </table>
+          </td>
+        </tr>
+        {reply_button}
+        <tr>
+          <td style="padding:16px 32px;background:#fafafa;border-top:1px solid #eee;">
+            <p style="margin:0;color:#999;font-size:12px;">\
+Delivered by {footer_name} &middot; <code style="background:#eee;padding:2px 6px;border-radius:3px;\
+font-size:11px;">/hooks/{slug}</code></p>
+          </td>
+        </tr>
+      </table>
+    </td></tr>
+  </table>
+</body>
+</html>"""
+
 
 async def dispatch_notifications(
     inbox,  # WebhookInbox model instance
@@ -28,32 +112,39 @@ async def dispatch_notifications(
 ) -> None:
     """
     Dispatch notifications to all active channels.
-    
+
     Args:
         inbox: WebhookInbox model instance
         channels: List of NotificationChannel model instances
         body: The webhook body data
         email_provider: Optional resolved EmailProvider instance
     """
+    active_channels = [c for c in channels if c.is_active]
+    if not active_channels:
+        return
+
     # Build context for all adapters
     ctx = ChannelContext(
         slug=inbox.slug,
         subject_prefix=inbox.email_subject_prefix or f"[{inbox.slug}]",
         sender_name=inbox.sender_name or "HookForms",
         body=body,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        hook_path=f"{HOOK_PATH_PREFIX}{inbox.slug}",
     )
-    
+
     # Collect tasks for async dispatch
+    client = get_safe_client()
     tasks = []
     email_recipients = []
-    
-    for channel in channels:
-        if not channel.is_active:
-            continue
-        
+    # Formatted payloads for this submission, keyed by channel type and the
+    # non-URL config, so channels that differ only in URL serialize once
+    payload_cache = {}
+
+    for channel in active_channels:
         try:
             channel_type = channel.type
-            
+
             # Auto-detect if type is 'webhook'
             if channel_type == "webhook":
                 url = channel.config.get("url", "")
@@ -61,58 +152,64 @@ async def dispatch_notifications(
                     detected_type = detect_channel_type(url)
                     if detected_type != "webhook":
                         channel_type = detected_type
-            
-            # Get the appropriate formatter
-            if channel_type == "discord":
-                payload = format_discord(channel.config, ctx)
-            elif channel_type == "slack":
-                payload = format_slack(channel.config, ctx)
-            elif channel_type == "teams":
-                payload = format_teams(channel.config, ctx)
-            elif channel_type == "telegram":
-                payload = format_telegram(channel.config, ctx)
-            elif channel_type == "ntfy":
-                payload = format_ntfy(channel.config, ctx)
-            elif channel_type == "webhook":
-                payload = format_webhook(channel.config, ctx)
-            elif channel_type == "email":
+
+            if channel_type == "email":
                 # Collect email recipients for later processing
                 recipients = channel.config.get("recipients", [])
                 if isinstance(recipients, str):
                     recipients = [r.strip() for r in recipients.split(",") if r.strip()]
                 email_recipients.extend(recipients)
                 continue
-            else:
-                logger.warning(f"Unknown channel type: {channel_type}")
+
+            # Get the appropriate formatter
+            formatter = _FORMATTERS.get(channel_type)
+            if formatter is None:
+                logger.warning("Unknown channel type: %s", channel_type)
                 continue
-            
+            url_key = _URL_CONFIG_KEYS[channel_type]
+            cache_key = (
+                channel_type,
+                orjson.dumps(
+                    {k: v for k, v in channel.config.items() if k != url_key},
+                    option=orjson.OPT_SORT_KEYS,
+                    default=str,
+                ),
+            )
+            cached = payload_cache.get(cache_key)
+            if cached is None:
+                payload = formatter(channel.config, ctx)
+                payload_cache[cache_key] = payload
+            else:
+                payload = dataclasses.replace(cached, url=channel.config.get(url_key, ""))
+
             # Create async task for HTTP request
-            tasks.append(_send_notification(payload, channel.id))
-            
+            tasks.append(_send_notification(client, payload, channel.id))
+
         except Exception as e:
-            logger.error(f"Error preparing notification for channel {channel.id}: {e}", exc_info=True)
-    
+            logger.error(
+                "Error preparing notification for channel %s: %s", channel.id, e, exc_info=True
+            )
+
     # Fire all HTTP notifications concurrently
     if tasks:
         await asyncio.gather(*tasks, return_exceptions=True)
-    
+
+    # Fields the email would list; with none to show, no email is sent
+    email_fields = iter_fields(body) if email_recipients and email_provider else []
+
     # Rate-limit email notifications (max 10 per inbox per 10 minutes)
-    if email_recipients and email_provider:
+    if email_fields:
         try:
-            from app.redis import redis as redis_client
             rate_key = f"channel_email_rate:{inbox.id}"
-            email_count = await redis_client.incr(rate_key)
-            if email_count == 1:
-                await redis_client.expire(rate_key, 600)
-            if email_count > 10:
+            if await window_exceeded(rate_key, limit=10, window=600):
                 logger.warning("Email rate limit hit for inbox %s (channel dispatcher)", inbox.slug)
                 email_recipients = []  # Skip sending
         except Exception:
             logger.warning("Email rate limiter unavailable for inbox %s", inbox.slug)
-    
+
     # Handle email notifications via resolved provider
-    if email_recipients and email_provider:
-        await _send_emails(email_provider, email_recipients, ctx, body)
+    if email_fields and email_recipients:
+        await _send_emails(email_provider, email_recipients, ctx, body, email_fields)
 
 
 async def _send_emails(
@@ -120,10 +217,11 @@ async def _send_emails(
     recipients: list[str],
     ctx: ChannelContext,
     body: dict,
+    fields: list[tuple[str, object]],
 ) -> None:
     """Send email notifications to all recipients via the resolved provider."""
     # Build HTML email body
-    html_body = _build_email_html(ctx.slug, body, ctx.sender_name)
+    html_body = _build_email_html(ctx.slug, body, fields, ctx.sender_name)
 
     name = str(body.get("name", "Unknown"))
     subject_detail = f"from {name}" if name != "Unknown" else "New Submission"
@@ -158,96 +256,63 @@ async def _send_single_email(
         raise
 
 
-def _build_email_html(slug: str, body: dict, sender_name: str) -> str:
-    """Build the HTML email body from form fields."""
+def _build_email_html(
+    slug: str, body: dict, fields: list[tuple[str, object]], sender_name: str
+) -> str:
+    """Build the HTML email body from the displayable (key, value) fields."""
     escape = html_lib.escape
-    slug_escaped = escape(slug)
-
-    skip_keys = {"raw", "source", "cf-turnstile-response"}
-    field_rows = ""
-    for key, val in body.items():
-        if key in skip_keys or not val:
-            continue
-        label = escape(key.replace("_", " ").title())
-        escaped_val = escape(format_value(val))
-        field_rows += (
-            f"<tr>"
-            f'<td style="padding:10px 14px;font-weight:600;color:#555;'
-            f'white-space:nowrap;vertical-align:top;border-bottom:1px solid #eee;">{label}</td>'
-            f'<td style="padding:10px 14px;color:#222;border-bottom:1px solid #eee;">{escaped_val}</td>'
-            f"</tr>"
+
+    field_rows = "".join(
+        _EMAIL_ROW_TEMPLATE.format(
+            label=escape(pretty_label(key)),
+            value=escape(format_value(val)),
         )
+        for key, val in fields
+    )
 
     name = escape(str(body.get("name", "Unknown")))
     email_raw = str(body.get("email", ""))
-    email_escaped = escape(email_raw)
     subject_detail = f"from {name}" if name != "Unknown" else "New Submission"
-    footer_name = escape(sender_name or "HookForms")
 
     reply_button = ""
     if email_raw:
-        reply_button = (
-            f'<tr><td style="padding:0 32px 24px;"><a href="mailto:{email_escaped}" '
-            f'style="display:inline-block;padding:10px 20px;background:#1a1a2e;color:#fff;'
-            f'text-decoration:none;border-radius:5px;font-size:14px;">Reply to {name}</a></td></tr>'
-        )
+        reply_button = _EMAIL_REPLY_TEMPLATE.format(email=escape(email_raw), name=name)
 
-    return f"""<!DOCTYPE html>
-<html>
-<head><meta charset="utf-8"></head>
-<body style="margin:0;padding:0;background:#f4f5f7;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Helvetica,Arial,sans-serif;">
-  <table width="100%" cellpadding="0" cellspacing="0" style="background:#f4f5f7;padding:32px 0;">
-    <tr><td align="center">
-      <table width="600" cellpadding="0" cellspacing="0" style="background:#ffffff;border-radius:8px;overflow:hidden;box-shadow:0 2px 8px rgba(0,0,0,0.08);">
-        <tr>
-          <td style="background:#1a1a2e;padding:24px 32px;">
-            <h1 style="margin:0;color:#ffffff;font-size:20px;font-weight:600;">{subject_detail}</h1>
-          </td>
-        </tr>
-        <tr>
-          <td style="padding:24px 32px;">
-            <p style="margin:0 0 16px;color:#666;font-size:14px;">A new form submission was received:</p>
-            <table width="100%" cellpadding="0" cellspacing="0" style="border:1px solid #eee;border-radius:6px;overflow:hidden;">
-              {field_rows}
-            </table>
-          </td>
-        </tr>
-        {reply_button}
-        <tr>
-          <td style="padding:16px 32px;background:#fafafa;border-top:1px solid #eee;">
-            <p style="margin:0;color:#999;font-size:12px;">Delivered by {footer_name} &middot; <code style="background:#eee;padding:2px 6px;border-radius:3px;font-size:11px;">/hooks/{slug_escaped}</code></p>
-          </td>
-        </tr>
-      </table>
-    </td></tr>
-  </table>
-</body>
-</html>"""
+    return _EMAIL_TEMPLATE.format(
+        subject_detail=subject_detail,
+        field_rows=field_rows,
+        reply_button=reply_button,
+        footer_name=escape(sender_name or "HookForms"),
+        slug=escape(slug),
+    )
 
 
-async def _send_notification(payload, channel_id) -> None:
+async def _send_notification(client, payload, channel_id) -> None:
     """
     Send a single notification via HTTP.
-    
+
     Args:
+        client: Shared SSRF-safe httpx.AsyncClient
         payload: ChannelPayload instance
         channel_id: Channel ID for logging
     """
     try:
-        async with safe_http_client(timeout=10) as client:
-            response = await client.request(
-                method=payload.method,
-                url=payload.url,
-                headers=payload.headers,
-                content=payload.body,
+        response = await client.request(
+            method=payload.method,
+            url=payload.url,
+            headers=payload.headers,
+            content=payload.body,
+        )
+
+        if response.status_code >= 400:
+            logger.warning(
+                "Channel %s returned status %s: %s",
+                channel_id,
+                response.status_code,
+                response.text[:200],
             )
-            
-            if response.status_code >= 400:
-                logger.warning(
-                    f"Channel {channel_id} returned status {response.status_code}: {response.text[:200]}"
-                )
-            else:
-                logger.debug(f"Successfully sent notification to channel {channel_id}")
-                
+        else:
+            logger.debug("Successfully sent notification to channel %s", channel_id)
+
     except Exception as e:
-        logger.error(f"Failed to send notification to channel {channel_id}: {e}", exc_info=True)
+        logger.error("Failed to send notification to channel %s: %s", channel_id, e, exc_info=True)
@@ -8,9 +8,11 @@ Priority order for display-name extraction:
   full_name > name > login > title > label > email > url > id
 """
 
-import json
+from functools import lru_cache
 from typing import Any
 
+import orjson
+
 # Keys we look for (in priority order) when extracting a display name from a dict.
 DISPLAY_KEYS = (
     "full_name",
@@ -24,8 +26,35 @@ DISPLAY_KEYS = (
     "id",
 )
 
+_DISPLAY_SET = frozenset(DISPLAY_KEYS)
+
+
+@lru_cache(maxsize=2048)
+def pretty_label(key: str) -> str:
+    """Turn a body key like ``first_name`` into a display label (``First Name``).
 
-def format_value(val: Any, max_len: int = 300) -> str:
+    Form keys repeat across submissions, so the result is memoized per key.
+    """
+    return key.replace("_", " ").title()
+
+
+@lru_cache(maxsize=2048)
+def spaced_label(key: str) -> str:
+    """Like :func:`pretty_label` but keeps the key's original casing."""
+    return key.replace("_", " ")
+
+
+def _truncate(text: str, max_len: int, clip: bool) -> str:
+    if len(text) <= max_len:
+        return text
+    # Clipped output keeps the ellipsis inside max_len so callers with a hard
+    # length limit don't need to slice again.
+    if clip:
+        return f"{text[: max_len - 3]}..."
+    return f"{text[:max_len]}..."
+
+
+def format_value(val: Any, max_len: int = 300, clip: bool = False) -> str:
     """
     Format a single value into a human-readable string.
 
@@ -33,13 +62,16 @@ def format_value(val: Any, max_len: int = 300) -> str:
     - Lists of primitives are joined with ", ".
     - Dicts are inspected for well-known display keys; if found we return that.
     - Otherwise we return compact JSON (truncated to *max_len* chars).
+
+    With ``clip=True`` every result, primitives included, is at most *max_len*
+    characters long.
     """
     if val is None:
         return ""
 
     # Primitives
     if not isinstance(val, (dict, list)):
-        return str(val)
+        return _truncate(str(val), max_len, clip) if clip else str(val)
 
     # Lists
     if isinstance(val, list):
@@ -47,20 +79,39 @@ def format_value(val: Any, max_len: int = 300) -> str:
             return "(empty)"
         # If every element is a primitive, join them
         if all(not isinstance(v, (dict, list)) for v in val):
-            return ", ".join(str(v) for v in val)
-        # List of dicts -- try to extract display names from each
-        items = [format_value(v, 80) for v in val]
-        joined = ", ".join(items)
-        return f"{joined[:max_len]}..." if len(joined) > max_len else joined
+            joined = ", ".join(str(v) for v in val)
+            return _truncate(joined, max_len, clip) if clip else joined
+        # List of dicts -- try to extract display names from each, stopping
+        # once the joined text is certain to be truncated anyway
+        items = []
+        total = -2  # no separator before the first item
+        for v in val:
+            item = format_value(v, 80)
+            items.append(item)
+            total += len(item) + 2
+            if total > max_len:
+                break
+        return _truncate(", ".join(items), max_len, clip)
 
-    # Dicts -- try display-name extraction
-    for key in DISPLAY_KEYS:
-        if key in val and val[key] is not None and not isinstance(val[key], (dict, list)):
-            return str(val[key])
+    # Dicts -- try display-name extraction (only walk the priority list when
+    # the dict has at least one display key)
+    candidates = _DISPLAY_SET.intersection(val)
+    if candidates:
+        for key in DISPLAY_KEYS:
+            if key not in candidates:
+                continue
+            item = val[key]
+            if item is not None and not isinstance(item, (dict, list)):
+                display = str(item)
+                return _truncate(display, max_len, clip) if clip else display
 
     # Fallback: compact JSON (truncated)
     try:
-        dumped = json.dumps(val, default=str)
-        return f"{dumped[:max_len]}..." if len(dumped) > max_len else dumped
+        dumped = orjson.dumps(val, default=str, option=orjson.OPT_NON_STR_KEYS)
     except (TypeError, ValueError):
         return "[complex value]"
+    if len(dumped) <= max_len:
+        return dumped.decode()
+    # Decode only the kept prefix; a multi-byte character split by the cut is dropped
+    cut = max_len - 3 if clip else max_len
+    return f"{dumped[:cut].decode('utf-8', 'ignore')}..."
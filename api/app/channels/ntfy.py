@@ -1,30 +1,26 @@
 """Ntfy channel adapter."""
 
-from app.channels import ChannelContext, ChannelPayload
-from app.channels.format_value import format_value
+from app.channels import ChannelContext, ChannelPayload, iter_fields
+from app.channels.format_value import format_value, pretty_label
 
 
 def format_ntfy(config: dict, ctx: ChannelContext) -> ChannelPayload:
     """
     Format a notification for ntfy.sh.
-    
+
     Config expects:
         - url: Ntfy topic URL (e.g., https://ntfy.sh/mytopic)
     """
     url = config.get("url", "")
-    
-    # Filter out sensitive/internal keys
-    skip_keys = {"cf-turnstile-response", "raw", "source"}
-    
+
     # Build plain text message
-    lines = []
-    for k, v in ctx.body.items():
-        if v and k not in skip_keys:
-            label = k.replace("_", " ").title()
-            lines.append(f"{label}: {format_value(v)}")
-    
+    lines = [
+        f"{pretty_label(k)}: {format_value(v)}"
+        for k, v in iter_fields(ctx.body)
+    ]
+
     body_text = "\n".join(lines)
-    
+
     return ChannelPayload(
         method="POST",
         url=url,
@@ -32,7 +28,7 @@ def format_ntfy(config: dict, ctx: ChannelContext) -> ChannelPayload:
             "Title": f"{ctx.subject_prefix} New Submission",
             "Tags": "incoming_envelope",
             "Priority": "default",
-            "X-Forwarded-From": f"hookforms/hooks/{ctx.slug}",
+            "X-Forwarded-From": ctx.hook_path,
         },
-        body=body_text,
+        body=body_text.encode(),
     )
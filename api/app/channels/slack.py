@@ -1,47 +1,43 @@
 """Slack channel adapter."""
 
-import json
+import orjson
 
-from app.channels import ChannelContext, ChannelPayload
-from app.channels.format_value import format_value
+from app.channels import ChannelContext, ChannelPayload, iter_fields
+from app.channels.format_value import format_value, spaced_label
+
+# Static Slack message skeleton; only the JSON-encoded title and text vary
+_SLACK_TEMPLATE = (
+    b'{"text":%s,"blocks":[{"type":"section","text":{"type":"mrkdwn","text":%s}}]}'
+)
 
 
 def format_slack(config: dict, ctx: ChannelContext) -> ChannelPayload:
     """
     Format a notification for Slack webhook.
-    
+
     Config expects:
         - webhook_url: Slack webhook URL
     """
     webhook_url = config.get("webhook_url", "")
-    
-    # Filter out sensitive/internal keys
-    skip_keys = {"cf-turnstile-response", "raw", "source"}
-    
+
     # Build mrkdwn formatted lines
     lines = [
-        f"*{k.replace('_', ' ')}:* {format_value(v)}"
-        for k, v in ctx.body.items()
-        if v and k not in skip_keys
+        f"*{spaced_label(k)}:* {format_value(v)}"
+        for k, v in iter_fields(ctx.body)
     ]
-    
+
     # Build Slack message with blocks
-    slack_body = {
-        "text": f"{ctx.subject_prefix} New Submission",
-        "blocks": [
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": "\n".join(lines)},
-            }
-        ],
-    }
-    
+    slack_body = _SLACK_TEMPLATE % (
+        orjson.dumps(f"{ctx.subject_prefix} New Submission"),
+        orjson.dumps("\n".join(lines)),
+    )
+
     return ChannelPayload(
         method="POST",
         url=webhook_url,
         headers={
             "Content-Type": "application/json",
-            "X-Forwarded-From": f"hookforms/hooks/{ctx.slug}",
+            "X-Forwarded-From": ctx.hook_path,
         },
-        body=json.dumps(slack_body),
+        body=slack_body,
     )
@@ -1,78 +1,56 @@
 """Microsoft Teams channel adapter."""
 
-import datetime
-import json
+import orjson
 
-from app.channels import ChannelContext, ChannelPayload
-from app.channels.format_value import format_value
+from app.channels import ChannelContext, ChannelPayload, iter_fields
+from app.channels.format_value import format_value, pretty_label
+
+# Static Teams message / Adaptive Card skeleton; the title, facts and footer
+# are JSON-encoded separately and spliced in
+_TEAMS_TEMPLATE = (
+    b'{"type":"message","attachments":[{'
+    b'"contentType":"application/vnd.microsoft.card.adaptive",'
+    b'"content":{"type":"AdaptiveCard",'
+    b'"$schema":"http://adaptivecards.io/schemas/adaptive-card.json",'
+    b'"version":"1.4","body":['
+    b'{"type":"TextBlock","text":%s,"weight":"Bolder","size":"Large","wrap":true},'
+    b'{"type":"FactSet","facts":%s},'
+    b'{"type":"TextBlock","text":%s,"size":"Small","color":"Accent","wrap":true}'
+    b']}}]}'
+)
 
 
 def format_teams(config: dict, ctx: ChannelContext) -> ChannelPayload:
     """
     Format a notification for Microsoft Teams webhook using Adaptive Cards.
-    
+
     Config expects:
         - webhook_url: Teams webhook URL
     """
     webhook_url = config.get("webhook_url", "")
-    
-    # Filter out sensitive/internal keys
-    skip_keys = {"cf-turnstile-response", "raw", "source"}
-    
+
     # Build FactSet for Adaptive Card
     facts = [
         {
-            "title": k.replace("_", " ").title(),
-            "value": format_value(v, 1024)[:1024],
+            "title": pretty_label(k),
+            "value": format_value(v, 1024, clip=True),
         }
-        for k, v in ctx.body.items()
-        if v and k not in skip_keys
+        for k, v in iter_fields(ctx.body)
     ]
-    
-    # Build Adaptive Card
-    adaptive_card = {
-        "type": "AdaptiveCard",
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "version": "1.4",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": f"{ctx.subject_prefix} New Submission",
-                "weight": "Bolder",
-                "size": "Large",
-                "wrap": True,
-            },
-            {
-                "type": "FactSet",
-                "facts": facts,
-            },
-            {
-                "type": "TextBlock",
-                "text": f"hookforms/hooks/{ctx.slug}",
-                "size": "Small",
-                "color": "Accent",
-                "wrap": True,
-            },
-        ],
-    }
-    
-    # Wrap in Teams message format
-    teams_body = {
-        "type": "message",
-        "attachments": [
-            {
-                "contentType": "application/vnd.microsoft.card.adaptive",
-                "content": adaptive_card,
-            }
-        ],
-    }
-    
+
+    # Build Adaptive Card wrapped in Teams message format
+    teams_body = _TEAMS_TEMPLATE % (
+        orjson.dumps(f"{ctx.subject_prefix} New Submission"),
+        orjson.dumps(facts),
+        orjson.dumps(ctx.hook_path),
+    )
+
     return ChannelPayload(
         method="POST",
         url=webhook_url,
         headers={
             "Content-Type": "application/json",
-            "X-Forwarded-From": f"hookforms/hooks/{ctx.slug}",
+            "X-Forwarded-From": ctx.hook_path,
         },
-        body=json.dumps(teams_body),
+        body=teams_body,
     )
@@ -1,52 +1,47 @@
 """Telegram channel adapter."""
 
-import json
+import orjson
 
-from app.channels import ChannelContext, ChannelPayload
-from app.channels.format_value import format_value
+from app.channels import ChannelContext, ChannelPayload, iter_fields
+from app.channels.format_value import format_value, pretty_label
+
+# Single-pass HTML entity escaping for Telegram's HTML parse mode
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# Static Telegram sendMessage skeleton; only chat_id and text vary
+_TELEGRAM_TEMPLATE = b'{"chat_id":%s,"text":%s,"parse_mode":"HTML"}'
 
 
 def format_telegram(config: dict, ctx: ChannelContext) -> ChannelPayload:
     """
     Format a notification for Telegram bot API.
-    
+
     Config expects:
         - bot_url: Telegram bot API URL (e.g., https://api.telegram.org/bot<TOKEN>/sendMessage)
         - chat_id: Telegram chat ID
     """
     bot_url = config.get("bot_url", "")
     chat_id = config.get("chat_id", "")
-    
-    # Filter out sensitive/internal keys
-    skip_keys = {"cf-turnstile-response", "raw", "source"}
-    
-    # Build HTML formatted message
-    lines = [f"<b>{ctx.subject_prefix} New Submission</b>\n"]
-    
-    for k, v in ctx.body.items():
-        if v and k not in skip_keys:
-            label = k.replace("_", " ").title()
-            # Escape HTML entities
-            value = format_value(v).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            lines.append(f"<b>{label}:</b> {value}")
-    
-    lines.append(f"\n<i>hookforms/hooks/{ctx.slug}</i>")
-    
-    text = "\n".join(lines)
-    
+
+    # Build HTML formatted message (HTML entities escaped in values)
+    middle = [
+        f"<b>{pretty_label(k)}:</b> {format_value(v).translate(_HTML_ESCAPE_TABLE)}"
+        for k, v in iter_fields(ctx.body)
+    ]
+
+    header = f"<b>{ctx.subject_prefix} New Submission</b>\n"
+    footer = f"\n<i>{ctx.hook_path}</i>"
+    text = "\n".join([header, *middle, footer])
+
     # Build Telegram API request body
-    telegram_body = {
-        "chat_id": chat_id,
-        "text": text,
-        "parse_mode": "HTML",
-    }
-    
+    telegram_body = _TELEGRAM_TEMPLATE % (orjson.dumps(chat_id), orjson.dumps(text))
+
     return ChannelPayload(
         method="POST",
         url=bot_url,
         headers={
             "Content-Type": "application/json",
-            "X-Forwarded-From": f"hookforms/hooks/{ctx.slug}",
+            "X-Forwarded-From": ctx.hook_path,
         },
-        body=json.dumps(telegram_body),
+        body=telegram_body,
     )
@@ -1,40 +1,73 @@
 """Config validation for notification channels and email providers."""
 
+import re
 from typing import Optional
 from urllib.parse import urlparse
 
-VALID_CHANNEL_TYPES = {"email", "discord", "slack", "teams", "telegram", "ntfy", "webhook"}
-VALID_PROVIDER_TYPES = {"gmail", "resend", "sendgrid", "smtp"}
-
-# Common typos -> correct type
-_CHANNEL_SUGGESTIONS: dict[str, str] = {
-    "discrod": "discord",
-    "dicord": "discord",
-    "disocrd": "discord",
-    "slak": "slack",
-    "sclack": "slack",
-    "team": "teams",
+VALID_CHANNEL_TYPES = frozenset(
+    {"email", "discord", "slack", "teams", "telegram", "ntfy", "webhook"}
+)
+VALID_PROVIDER_TYPES = frozenset({"gmail", "resend", "sendgrid", "smtp"})
+
+# Required config fields per email provider type
+_PROVIDER_REQUIRED_FIELDS: dict[str, tuple[str, ...]] = {
+    "gmail": ("credentials_path", "token_path", "sender_email"),
+    "resend": ("api_key", "from_email"),
+    "sendgrid": ("api_key", "from_email"),
+    "smtp": ("host", "port", "from_email"),
+}
+
+# Quick accept for http(s) URLs whose whole authority is plain ASCII URL
+# characters, which urlparse always accepts; anything else (IPv6 brackets,
+# non-ASCII hosts, malformed input) goes through urlparse
+_URL_RE = re.compile(r"https?://[\w.~%!$&'()*+,;=:@-]+(?:[/?#]|$)", re.IGNORECASE | re.ASCII)
+
+# Aliases that are not near-miss spellings of a valid type
+_CHANNEL_ALIASES: dict[str, str] = {
     "ms-teams": "teams",
-    "msteams": "teams",
     "microsoft-teams": "teams",
-    "telegarm": "telegram",
-    "telgram": "telegram",
     "tg": "telegram",
-    "emal": "email",
-    "mail": "email",
-    "e-mail": "email",
-    "webhok": "webhook",
     "hook": "webhook",
-    "nfty": "ntfy",
-    "notify": "ntfy",
 }
 
+# Fixed order so ties between equally close types resolve deterministically
+_CHANNEL_TYPES_ORDERED = tuple(sorted(VALID_CHANNEL_TYPES))
+
+# Maximum edit distance for a typo suggestion
+_MAX_TYPO_DISTANCE = 2
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two short strings."""
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
 
 def suggest_channel_type(input_type: str) -> Optional[str]:
-    """Return a suggestion if the input looks like a typo of a valid type."""
+    """Return a suggestion if the input looks like a typo of a valid type.
+
+    Any spelling within two edits of a valid type is matched, so new typos
+    don't need to be listed by hand; only true aliases are kept in a table.
+    """
     if input_type in VALID_CHANNEL_TYPES:
         return None
-    return _CHANNEL_SUGGESTIONS.get(input_type.lower())
+    lowered = input_type.lower()
+    if lowered in VALID_CHANNEL_TYPES:
+        return lowered
+    alias = _CHANNEL_ALIASES.get(lowered)
+    if alias:
+        return alias
+    best, best_distance = None, _MAX_TYPO_DISTANCE + 1
+    for channel_type in _CHANNEL_TYPES_ORDERED:
+        distance = _edit_distance(lowered, channel_type)
+        if distance < best_distance:
+            best, best_distance = channel_type, distance
+    return best
 
 
 def validate_channel_config(channel_type: str, config: dict) -> Optional[str]:
@@ -42,16 +75,7 @@ def validate_channel_config(channel_type: str, config: dict) -> Optional[str]:
     Validate channel config for a given type.
     Returns None if valid, or an error message string if invalid.
     """
-    validators = {
-        "email": _validate_email,
-        "discord": _validate_discord,
-        "slack": _validate_slack,
-        "teams": _validate_teams,
-        "telegram": _validate_telegram,
-        "ntfy": _validate_ntfy,
-        "webhook": _validate_webhook,
-    }
-    validator = validators.get(channel_type)
+    validator = _CHANNEL_VALIDATORS.get(channel_type)
     if not validator:
         return f"Unknown channel type: {channel_type}"
     return validator(config)
@@ -62,22 +86,16 @@ def validate_provider_config(provider_type: str, config: dict) -> Optional[str]:
     Validate email provider config.
     Returns None if valid, or an error message string if invalid.
     """
-    if provider_type == "gmail":
-        return _require_fields(config, ["credentials_path", "token_path", "sender_email"])
-    elif provider_type == "resend":
-        return _require_fields(config, ["api_key", "from_email"])
-    elif provider_type == "sendgrid":
-        return _require_fields(config, ["api_key", "from_email"])
-    elif provider_type == "smtp":
-        return _require_fields(config, ["host", "port", "from_email"])
-    else:
+    required = _PROVIDER_REQUIRED_FIELDS.get(provider_type)
+    if required is None:
         return f"Unknown provider type: {provider_type}"
+    return _require_fields(config, required)
 
 
 # --- Internal validators ---
 
 
-def _require_fields(config: dict, fields: list[str]) -> Optional[str]:
+def _require_fields(config: dict, fields: tuple[str, ...]) -> Optional[str]:
     for field in fields:
         if not config.get(field):
             return f"Missing required field: {field}"
@@ -87,6 +105,8 @@ def _require_fields(config: dict, fields: list[str]) -> Optional[str]:
 def _validate_url(value, field_name: str) -> Optional[str]:
     if not isinstance(value, str) or not value:
         return f"Missing required field: {field_name}"
+    if _URL_RE.match(value):
+        return None
     try:
         parsed = urlparse(value)
         if parsed.scheme not in ("http", "https"):
@@ -166,3 +186,15 @@ def _validate_webhook(config: dict) -> Optional[str]:
     if custom_headers is not None and not isinstance(custom_headers, dict):
         return "custom_headers must be an object"
     return None
+
+
+# Channel type -> config validator (defined after the validators it references)
+_CHANNEL_VALIDATORS = {
+    "email": _validate_email,
+    "discord": _validate_discord,
+    "slack": _validate_slack,
+    "teams": _validate_teams,
+    "telegram": _validate_telegram,
+    "ntfy": _validate_ntfy,
+    "webhook": _validate_webhook,
+}
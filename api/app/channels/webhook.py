@@ -1,40 +1,40 @@
 """Generic webhook channel adapter."""
 
-import json
+import orjson
 
-from app.channels import ChannelContext, ChannelPayload
+from app.channels import SKIP_KEYS, ChannelContext, ChannelPayload
 
 
 def format_webhook(config: dict, ctx: ChannelContext) -> ChannelPayload:
     """
     Format a notification for a generic webhook.
-    
+
     Config expects:
         - url: Webhook URL
         - custom_headers: Optional dict of custom headers
     """
     url = config.get("url", "")
     custom_headers = config.get("custom_headers", {})
-    
-    # Filter out sensitive/internal keys
-    skip_keys = {"cf-turnstile-response", "raw", "source"}
-    
-    # Build clean body
-    clean_body = {k: v for k, v in ctx.body.items() if k not in skip_keys}
-    
+
+    # Build clean body (only copy the dict when there is something to drop)
+    if SKIP_KEYS.isdisjoint(ctx.body):
+        clean_body = ctx.body
+    else:
+        clean_body = {k: v for k, v in ctx.body.items() if k not in SKIP_KEYS}
+
     # Build headers
     headers = {
         "Content-Type": "application/json",
-        "X-Forwarded-From": f"hookforms/hooks/{ctx.slug}",
+        "X-Forwarded-From": ctx.hook_path,
     }
-    
+
     # Add custom headers if provided
     if isinstance(custom_headers, dict):
         headers.update(custom_headers)
-    
+
     return ChannelPayload(
         method="POST",
         url=url,
         headers=headers,
-        body=json.dumps(clean_body),
+        body=orjson.dumps(clean_body),
     )
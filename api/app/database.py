@@ -1,8 +1,24 @@
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False, pool_pre_ping=True)
+
+def _json_serializer(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    pool_pre_ping=True,
+    # Rows per multi-row INSERT when executing batched inserts
+    insertmanyvalues_page_size=1000,
+    # JSON/JSONB columns (event bodies and headers, channel configs) go
+    # through orjson instead of the stdlib json module
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
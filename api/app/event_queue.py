@@ -0,0 +1,274 @@
+"""Batched webhook event ingestion.
+
+The public receiver pushes each event onto a Redis list instead of running
+its own INSERT + COMMIT; a lifespan-managed task pops events in batches and
+writes each batch with a single multi-row INSERT, or with binary COPY once the
+batch is large enough for COPY's setup cost to pay off.
+
+Delivery is at least once. A flusher first moves the events it takes into its
+own processing list, and only deletes them there once their batch has
+committed. Events held by a flusher that died are put back on the queue by
+the worker (requeue_orphaned_events). Inserts skip rows that already exist,
+so an event written twice is stored once. When a batch fails, its rows are
+retried one by one; rows Postgres rejects for their data (e.g. an inbox
+deleted meanwhile) go to a dead-letter list instead of blocking the queue.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session, engine
+from app.models.webhook import WebhookEvent
+from app.redis import redis as redis_client
+
+logger = logging.getLogger(__name__)
+
+EVENT_QUEUE_KEY = "hookforms:events:queue"
+DEAD_LETTER_KEY = "hookforms:events:dead"
+DEAD_LETTER_MAX = 10_000  # newest dead-lettered events kept
+PROCESSING_KEY_PREFIX = "hookforms:events:processing:"
+FLUSHER_KEY_PREFIX = "hookforms:events:flusher:"
+BATCH_SIZE = 500
+BLOCK_TIMEOUT = 1  # seconds the flusher blocks waiting for an event
+RETRY_DELAY = 1  # seconds to back off after a failed flush
+COPY_THRESHOLD = 100  # smaller batches go through INSERT
+
+# Each process claims events into its own processing list, and keeps a
+# heartbeat key alive while it runs so others can tell its list is not orphaned
+FLUSHER_ID = uuid.uuid4().hex
+_PROCESSING_KEY = f"{PROCESSING_KEY_PREFIX}{FLUSHER_ID}"
+_HEARTBEAT_KEY = f"{FLUSHER_KEY_PREFIX}{FLUSHER_ID}"
+_HEARTBEAT_TTL = 120
+_HEARTBEAT_REFRESH = 30
+
+_COPY_COLUMNS = (
+    "id",
+    "inbox_id",
+    "method",
+    "headers",
+    "body",
+    "query_params",
+    "source_ip",
+    "received_at",
+)
+_JSON_COLUMNS = frozenset({"headers", "body", "query_params"})
+
+# Top the processing list (KEYS[2]) up to ARGV[1] events from the consuming
+# end of the queue (KEYS[1]) and return all of it, so events left over from a
+# flush that could not finish are retried along with the new ones
+_claim = redis_client.register_script(
+    """
+    local want = tonumber(ARGV[1]) - redis.call('LLEN', KEYS[2])
+    if want > 0 then
+        local items = redis.call('RPOP', KEYS[1], want)
+        if items then redis.call('RPUSH', KEYS[2], unpack(items)) end
+    end
+    return redis.call('LRANGE', KEYS[2], 0, -1)
+    """
+)
+
+# Move a processing list (KEYS[1]) back to the consuming end of the queue
+# (KEYS[2]) in its original order; returns how many events were moved
+_requeue = redis_client.register_script(
+    """
+    local items = redis.call('LRANGE', KEYS[1], 0, -1)
+    for i = #items, 1, -1 do redis.call('RPUSH', KEYS[2], items[i]) end
+    redis.call('DEL', KEYS[1])
+    return #items
+    """
+)
+
+_flush_lock = asyncio.Lock()
+_heartbeat_at = 0.0
+
+
+def new_event_id() -> uuid.UUID:
+    """Return a UUIDv7 (RFC 9562): 48-bit Unix-ms timestamp, then random bits.
+
+    Time-ordered ids make each flushed batch append at the right edge of the
+    primary-key index instead of scattering page writes across it.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76  # version
+        | (rand >> 68) << 64  # rand_a: 12 bits
+        | 0b10 << 62  # variant
+        | (rand & 0x3FFF_FFFF_FFFF_FFFF)  # rand_b: 62 bits
+    )
+    return uuid.UUID(int=value)
+
+
+async def enqueue_event(row: dict[str, Any]) -> None:
+    """Queue a webhook_events row (id and received_at already set) for insertion."""
+    await redis_client.lpush(EVENT_QUEUE_KEY, orjson.dumps(row, default=str))
+
+
+async def insert_event(db: AsyncSession, row: dict[str, Any]) -> None:
+    """Write one webhook_events row directly (used when the queue is unavailable)."""
+    await db.execute(pg_insert(WebhookEvent).on_conflict_do_nothing(), [row])
+    await db.commit()
+
+
+def _decode_row(item: str) -> dict[str, Any]:
+    row = orjson.loads(item)
+    row["id"] = uuid.UUID(row["id"])
+    row["inbox_id"] = uuid.UUID(row["inbox_id"])
+    row["received_at"] = datetime.fromisoformat(row["received_at"])
+    return row
+
+
+def _copy_record(row: dict[str, Any]) -> tuple:
+    # asyncpg takes json/jsonb values as JSON text
+    return tuple(
+        orjson.dumps(row[col]).decode()
+        if col in _JSON_COLUMNS and row[col] is not None
+        else row[col]
+        for col in _COPY_COLUMNS
+    )
+
+
+async def _copy_rows(rows: list[dict[str, Any]]) -> None:
+    """Write rows with COPY FROM STDIN (binary) on the underlying asyncpg connection."""
+    async with engine.connect() as conn:
+        # No SQLAlchemy transaction is begun, so the COPY commits on its own
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            WebhookEvent.__tablename__,
+            records=[_copy_record(row) for row in rows],
+            columns=_COPY_COLUMNS,
+        )
+
+
+async def _insert_rows(rows: list[dict[str, Any]]) -> None:
+    async with async_session() as db:
+        # Rows already written by an earlier, interrupted flush are skipped
+        await db.execute(pg_insert(WebhookEvent).on_conflict_do_nothing(), rows)
+        await db.commit()
+
+
+def _rejected_for_data(exc: Exception) -> bool:
+    """Whether Postgres rejected a row for its content (data or constraint error)."""
+    sqlstate = getattr(exc, "sqlstate", None) or getattr(
+        getattr(exc, "orig", None), "sqlstate", None
+    )
+    return bool(sqlstate) and sqlstate[:2] in ("22", "23")
+
+
+async def _dead_letter(items: list[str]) -> None:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.rpush(DEAD_LETTER_KEY, *items)
+        pipe.ltrim(DEAD_LETTER_KEY, -DEAD_LETTER_MAX, -1)
+        await pipe.execute()
+
+
+async def _write(items: list[str]) -> int:
+    """Write claimed events; dead-letter the ones Postgres rejects. Returns rows written.
+
+    Errors that are not about a row's data (e.g. the database is unreachable)
+    propagate, so the caller can put the events back on the queue.
+    """
+    decoded, dead = [], []
+    for item in items:
+        try:
+            decoded.append((item, _decode_row(item)))
+        except (ValueError, KeyError, TypeError):
+            logger.error("Dead-lettering undecodable queued webhook event")
+            dead.append(item)
+
+    rows = [row for _, row in decoded]
+    written = 0
+    if rows:
+        try:
+            if len(rows) >= COPY_THRESHOLD:
+                await _copy_rows(rows)
+            else:
+                await _insert_rows(rows)
+            written = len(rows)
+        except Exception:
+            # One bad row fails the whole statement: find it by going row by row
+            logger.warning(
+                "Writing %d webhook events failed, retrying one by one", len(rows), exc_info=True
+            )
+            for item, row in decoded:
+                try:
+                    await _insert_rows([row])
+                    written += 1
+                except Exception as exc:
+                    if not _rejected_for_data(exc):
+                        raise
+                    logger.error("Dead-lettering webhook event %s: %s", row["id"], exc)
+                    dead.append(item)
+
+    if dead:
+        await _dead_letter(dead)
+    return written
+
+
+async def _heartbeat() -> None:
+    global _heartbeat_at
+    now = time.monotonic()
+    if now - _heartbeat_at >= _HEARTBEAT_REFRESH:
+        await redis_client.set(_HEARTBEAT_KEY, 1, ex=_HEARTBEAT_TTL)
+        _heartbeat_at = now
+
+
+async def flush_events(block: float = 0) -> int:
+    """Claim up to BATCH_SIZE queued events and write them in one statement.
+
+    With ``block``, waits up to that many seconds for an event when the queue
+    is empty. Returns the number of events claimed (written or dead-lettered).
+    """
+    async with _flush_lock:
+        await _heartbeat()
+        if block:
+            first = await redis_client.blmove(
+                EVENT_QUEUE_KEY, _PROCESSING_KEY, block, src="RIGHT", dest="RIGHT"
+            )
+            if first is None:
+                return 0
+        items = await _claim(keys=[EVENT_QUEUE_KEY, _PROCESSING_KEY], args=[BATCH_SIZE])
+        if not items:
+            return 0
+
+        try:
+            await _write(items)
+        except Exception:
+            # Put the batch back at the consuming end so it is retried first
+            await _requeue(keys=[_PROCESSING_KEY, EVENT_QUEUE_KEY])
+            raise
+        await redis_client.delete(_PROCESSING_KEY)
+        return len(items)
+
+
+async def requeue_orphaned_events() -> int:
+    """Return events claimed by flushers that are gone to the queue. Returns events moved."""
+    moved = 0
+    async for key in redis_client.scan_iter(match=f"{PROCESSING_KEY_PREFIX}*"):
+        flusher_id = key[len(PROCESSING_KEY_PREFIX) :]
+        if flusher_id == FLUSHER_ID or await redis_client.exists(
+            f"{FLUSHER_KEY_PREFIX}{flusher_id}"
+        ):
+            continue
+        moved += int(await _requeue(keys=[key, EVENT_QUEUE_KEY]))
+    return moved
+
+
+async def run_event_flusher() -> None:
+    """Drain the event queue continuously until cancelled."""
+    while True:
+        try:
+            await flush_events(block=BLOCK_TIMEOUT)
+        except Exception:
+            logger.exception("Failed to flush webhook events")
+            await asyncio.sleep(RETRY_DELAY)
@@ -0,0 +1,59 @@
+"""Short-lived per-process cache of active inboxes for the public receiver.
+
+Hot inboxes are looked up by slug on every webhook; caching the loaded inbox
+(with its active channels) for a short while skips those queries. Routes that
+change an inbox or its channels call ``invalidate_inbox``, which drops the
+entry locally and publishes the slug so every other worker drops it too.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+
+from app.models.webhook import WebhookInbox
+from app.redis import redis as redis_client
+
+logger = logging.getLogger(__name__)
+
+INBOX_INVALIDATE_CHANNEL = "hookforms:inbox_invalidate"
+
+# Upper bound on staleness if an invalidation message is missed; the listener
+# also clears the cache whenever it reconnects
+_INBOX_CACHE_TTL = 30
+_inbox_cache: TTLCache = TTLCache(maxsize=2048, ttl=_INBOX_CACHE_TTL)
+
+
+def get_cached_inbox(slug: str) -> Optional[WebhookInbox]:
+    return _inbox_cache.get(slug)
+
+
+def cache_inbox(inbox: WebhookInbox) -> None:
+    """Cache an active inbox whose channels relationship is already loaded."""
+    _inbox_cache[inbox.slug] = inbox
+
+
+async def invalidate_inbox(slug: str) -> None:
+    """Drop an inbox from this worker's cache and tell the other workers to."""
+    _inbox_cache.pop(slug, None)
+    try:
+        await redis_client.publish(INBOX_INVALIDATE_CHANNEL, slug)
+    except Exception:
+        logger.warning("Could not publish inbox invalidation for %s", slug)
+
+
+async def run_inbox_invalidation_listener() -> None:
+    """Apply invalidations published by other workers until cancelled."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INBOX_INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _inbox_cache.pop(message["data"], None)
+        except Exception:
+            logger.warning("Inbox invalidation listener disconnected, retrying", exc_info=True)
+            # Messages may have been missed while disconnected
+            _inbox_cache.clear()
+            await asyncio.sleep(1)
@@ -1,17 +1,15 @@
 """Gmail API helper — send email using OAuth2 refresh token."""
 
-import base64
+import asyncio
 import logging
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from pathlib import Path
 from typing import Optional
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 
 from app.config import settings
+from app.providers.gmail import build_raw_message, send_raw_message
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +17,8 @@ SCOPES = [
     "https://www.googleapis.com/auth/gmail.send",
 ]
 
-# Module-level cache for credentials and Gmail service to avoid
-# re-reading token files and rebuilding the API client on every send.
+# Module-level cache for credentials to avoid re-reading token files on every send.
 _cached_creds: Optional[Credentials] = None
-_cached_service = None
 
 
 def _get_credentials() -> Credentials:
@@ -60,19 +56,7 @@ def _get_credentials() -> Credentials:
     return _cached_creds
 
 
-def _get_service():
-    global _cached_service
-
-    creds = _get_credentials()
-
-    # Rebuild service if credentials changed or first call
-    if _cached_service is None:
-        _cached_service = build("gmail", "v1", credentials=creds, cache_discovery=False)
-
-    return _cached_service
-
-
-def send_email(
+async def send_email(
     to: str,
     subject: str,
     body: str,
@@ -81,28 +65,23 @@ def send_email(
     bcc: Optional[str] = None,
     sender_name: Optional[str] = None,
 ) -> dict:
-    """Send an email via Gmail API. Returns the Gmail API response."""
-    service = _get_service()
-    sender = settings.gmail_sender_email
-    display_name = sender_name or "HookForms"
-
-    if html:
-        msg = MIMEMultipart("alternative")
-        msg.attach(MIMEText(body, "html"))
-    else:
-        msg = MIMEText(body, "plain")
-
-    msg["to"] = to
-    msg["from"] = f"{display_name} <{sender}>"
-    msg["subject"] = subject
-
-    if cc:
-        msg["cc"] = cc
-    if bcc:
-        msg["bcc"] = bcc
-
-    raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
-    result = service.users().messages().send(userId="me", body={"raw": raw}).execute()
+    """Send an email via the Gmail REST API. Returns the Gmail API response."""
+    creds = _cached_creds
+    if creds is None or not creds.valid:
+        # Loading/refreshing the token is blocking I/O; keep it off the loop
+        creds = await asyncio.to_thread(_get_credentials)
+
+    raw = build_raw_message(
+        to=to,
+        sender=settings.gmail_sender_email,
+        display_name=sender_name or "HookForms",
+        subject=subject,
+        body=body,
+        html=html,
+        cc=cc,
+        bcc=bcc,
+    )
+    result = await send_raw_message(raw, creds.token)
 
     logger.info("Email sent: id=%s to=%s subject=%s", result.get("id"), to, subject)
     return result
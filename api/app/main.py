@@ -1,5 +1,6 @@
-from contextlib import asynccontextmanager
-from datetime import datetime, timezone
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
@@ -7,18 +8,42 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
+from app.auth_flush import flush_key_usage, run_key_usage_flusher
 from app.config import settings
-from app.database import engine
+from app.database import async_session, engine
+from app.event_queue import flush_events, run_event_flusher
+from app.inbox_cache import run_inbox_invalidation_listener
 from app.middleware import RateLimitMiddleware, RequestSizeLimitMiddleware
+from app.providers.http import close_http_client
 from app.redis import redis
 from app.routers import auth, channels, webhooks
+from app.security import close_safe_client
 
 API_VERSION = "0.1.0"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    key_usage_flusher = asyncio.create_task(run_key_usage_flusher())
+    event_flusher = asyncio.create_task(run_event_flusher())
+    inbox_listener = asyncio.create_task(run_inbox_invalidation_listener())
     yield
+    for task in (inbox_listener, event_flusher, key_usage_flusher):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # Best effort: write out events still queued by this process's requests
+    with suppress(Exception):
+        while await flush_events():
+            pass
+    # Best effort: persist usage recorded since the last periodic flush
+    with suppress(Exception):
+        await flush_key_usage()
+    # Let notifications for already-accepted webhooks finish before the
+    # HTTP clients they use are closed
+    await webhooks.drain_notifications()
+    await close_safe_client()
+    await close_http_client()
     await engine.dispose()
     await redis.aclose()
 
@@ -107,8 +132,6 @@ async def health_ping():
     checks = {}
 
     try:
-        from app.database import async_session
-
         async with async_session() as session:
             await session.execute(text("SELECT 1"))
         checks["postgres"] = "ok"
@@ -125,7 +148,7 @@ async def health_ping():
 
     return {
         "status": status,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "version": API_VERSION,
         "checks": checks,
     }
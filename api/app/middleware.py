@@ -3,6 +3,7 @@
 import logging
 import time
 
+from cachetools import TTLCache
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
@@ -32,11 +33,41 @@ _SECURITY_HEADERS = {
 }
 
 
+# Trim the window, count it, record this request and refresh the TTL in one
+# round trip. Returns the count before this request was added and, when that
+# is at the limit, the score of the entry whose expiry frees the next slot.
+# Scores and members are integer microseconds, so members are short and need
+# no float formatting.
+_rate_script = redis_client.register_script(
+    """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1])
+    local c = redis.call('ZCARD', KEYS[1])
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[2])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    local limit = tonumber(ARGV[4])
+    local frees = 0
+    if c >= limit then
+        frees = tonumber(redis.call('ZRANGE', KEYS[1], c - limit, c - limit, 'WITHSCORES')[2])
+    end
+    return {c, frees}
+    """
+)
+
+
+# IPs the shared window has put over the limit, per process: IP -> time (unix
+# seconds) a slot frees up. Until then they are refused without asking Redis;
+# admission itself always goes through the shared window, so this can only
+# refuse requests Redis would have refused too.
+_blocked_until: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Sliding window rate limiter using Redis sorted sets.
 
     - 100 requests/min per IP
+    - An IP found over the limit is refused locally, without a Redis round
+      trip, until its window has room again
     - Fails closed (503) when Redis is unavailable
     """
 
@@ -52,18 +83,20 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return response
 
         client_ip = _get_client_ip(request)
-        key = f"ratelimit:{client_ip}"
-        now = time.time()
-        window_start = now - self.WINDOW_SECONDS
+        now_us = time.time_ns() // 1000
+        now = now_us / 1_000_000
+
+        blocked_until = _blocked_until.get(client_ip)
+        if blocked_until is not None and now < blocked_until:
+            return self._too_many(blocked_until)
 
+        key = f"ratelimit:{client_ip}"
+        window_start_us = now_us - self.WINDOW_SECONDS * 1_000_000
         try:
-            pipe = redis_client.pipeline()
-            pipe.zremrangebyscore(key, 0, window_start)
-            pipe.zcard(key)
-            pipe.zadd(key, {f"{now}": now})
-            pipe.expire(key, self.WINDOW_SECONDS + 1)
-            results = await pipe.execute()
-            current_count = results[1]
+            current_count, frees_us = await _rate_script(
+                keys=[key],
+                args=[window_start_us, now_us, self.WINDOW_SECONDS + 1, self.LIMIT],
+            )
         except Exception:
             logger.error("Redis unavailable for rate limiting — denying request")
             return JSONResponse(
@@ -77,23 +110,31 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 headers=_SECURITY_HEADERS,
             )
 
+        if int(current_count) >= self.LIMIT:
+            blocked_until = int(frees_us) / 1_000_000 + self.WINDOW_SECONDS
+            _blocked_until[client_ip] = blocked_until
+            return self._too_many(blocked_until)
+
+        return await self._respond(request, call_next, int(current_count), now)
+
+    def _too_many(self, blocked_until: float) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"code": 429, "message": "Too many requests. Please retry later."}},
+            headers={
+                **_SECURITY_HEADERS,
+                "X-RateLimit-Limit": str(self.LIMIT),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int(blocked_until)),
+            },
+        )
+
+    async def _respond(
+        self, request: Request, call_next, current_count: int, now: float
+    ) -> Response:
         remaining = max(0, self.LIMIT - current_count - 1)
         reset_at = int(now + self.WINDOW_SECONDS)
 
-        if current_count >= self.LIMIT:
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "error": {"code": 429, "message": "Too many requests. Please retry later."}
-                },
-                headers={
-                    **_SECURITY_HEADERS,
-                    "X-RateLimit-Limit": str(self.LIMIT),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(reset_at),
-                },
-            )
-
         response = await call_next(request)
         response.headers["X-RateLimit-Limit"] = str(self.LIMIT)
         response.headers["X-RateLimit-Remaining"] = str(remaining)
@@ -116,12 +157,13 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
 
         content_length = request.headers.get("content-length")
         if content_length and int(content_length) > self.MAX_BODY_SIZE:
+            max_mb = self.MAX_BODY_SIZE // (1024 * 1024)
             return JSONResponse(
                 status_code=413,
                 content={
                     "error": {
                         "code": 413,
-                        "message": f"Request body too large. Max size is {self.MAX_BODY_SIZE // (1024 * 1024)} MB.",
+                        "message": f"Request body too large. Max size is {max_mb} MB.",
                     }
                 },
             )
@@ -1,20 +1,31 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import BigInteger, DateTime, Index, LargeBinary, String, text
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import Base, UUIDMixin, TimestampMixin
+from app.models.base import Base, TimestampMixin, UUIDMixin
 
 
 class ApiKey(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "api_keys"
+    __table_args__ = (
+        Index("ix_api_keys_active_prefix", "key_prefix", postgresql_where=text("is_active")),
+    )
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    key_hash: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
-    key_prefix: Mapped[Optional[str]] = mapped_column(String(12), nullable=True, index=True)
+    # Legacy PBKDF2 hash; only set for keys issued before key_sha256 existed
+    key_hash: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, unique=True)
+    key_sha256: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary(32), nullable=True, unique=True, index=True
+    )
+    key_prefix: Mapped[Optional[str]] = mapped_column(
+        String(12), nullable=True, unique=True, index=True
+    )
     scopes: Mapped[list[str]] = mapped_column(ARRAY(String), default=list)
+    # Bitmask of scopes (see app.auth.SCOPE_BITS) used for authorization checks
+    scopes_bits: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
     is_active: Mapped[bool] = mapped_column(default=True)
     last_used_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
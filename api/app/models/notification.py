@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, func, text
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -36,6 +36,20 @@ class NotificationChannel(Base):
 
 class EmailProvider(Base):
     __tablename__ = "email_providers"
+    __table_args__ = (
+        Index(
+            "ix_email_providers_active_inbox",
+            "inbox_id",
+            postgresql_where=text("is_active"),
+        ),
+        # At most one active global (inbox_id IS NULL) provider
+        Index(
+            "ix_email_providers_active_global",
+            text("(inbox_id IS NULL)"),
+            unique=True,
+            postgresql_where=text("inbox_id IS NULL AND is_active"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
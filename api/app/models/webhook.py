@@ -1,19 +1,35 @@
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSON, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base, UUIDMixin, TimestampMixin
+from app.models.base import Base, TimestampMixin, UUIDMixin
+
+if TYPE_CHECKING:
+    from app.models.notification import NotificationChannel
 
 
 class WebhookInbox(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "webhook_inboxes"
+    __table_args__ = (
+        # Unique slug index carrying id and is_active, so slug-to-id lookups are
+        # index-only scans (the unbounded text columns would risk the btree
+        # row-size limit)
+        Index(
+            "ix_webhook_inboxes_slug_cover",
+            "slug",
+            unique=True,
+            postgresql_include=["id", "is_active"],
+        ),
+    )
 
-    slug: Mapped[str] = mapped_column(String(100), nullable=False, unique=True, index=True)
+    slug: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     forward_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # "discord" | "slack" | "generic", derived from forward_url when it is written
+    forward_kind: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     notify_email: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     email_subject_prefix: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
     sender_name: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
@@ -30,17 +46,33 @@ class WebhookInbox(Base, UUIDMixin, TimestampMixin):
 
 class WebhookEvent(Base, UUIDMixin):
     __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Serves "events for an inbox, newest first" as an index range scan,
+        # including keyset pages that seek on (received_at, id)
+        Index(
+            "ix_webhook_events_inbox_received_id",
+            "inbox_id",
+            text("received_at DESC"),
+            text("id DESC"),
+        ),
+        # Retention's batched deletes by age
+        Index("ix_webhook_events_received_at", "received_at"),
+        # Monthly partitions (webhook_events_YYYY_MM) are created by migrations
+        # and the worker; retention drops whole partitions
+        {"postgresql_partition_by": "RANGE (received_at)"},
+    )
 
     inbox_id: Mapped["UUID"] = mapped_column(
         UUID(as_uuid=True), ForeignKey("webhook_inboxes.id", ondelete="CASCADE"), nullable=False
     )
     method: Mapped[str] = mapped_column(String(10), nullable=False)
-    headers: Mapped[dict] = mapped_column(JSON, default=dict)
-    body: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    headers: Mapped[dict] = mapped_column(JSONB, default=dict)
+    body: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     query_params: Mapped[dict] = mapped_column(JSON, default=dict)
     source_ip: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)
+    # Part of the primary key because it is the partition key
     received_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
     )
 
     inbox: Mapped["WebhookInbox"] = relationship(back_populates="events")
@@ -3,19 +3,76 @@
 import asyncio
 import base64
 import logging
-from email.mime.text import MIMEText
-from functools import partial
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from app.providers.base import EmailProvider
+from app.providers.http import get_http_client
+from app.providers.message import build_message
 
 logger = logging.getLogger(__name__)
 
+GMAIL_SEND_URL = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
+
+# OAuth credentials per token file, shared by every GmailProvider instance (the
+# resolver builds a fresh provider per submission). The lock serializes
+# loading/refreshing, which runs in worker threads.
+_creds_by_token_path: dict = {}
+_creds_lock = threading.Lock()
+
+_URLSAFE_B64 = bytes.maketrans(b"+/", b"-_")
+
+
+def build_raw_message(
+    to: str,
+    sender: str,
+    display_name: str,
+    subject: str,
+    body: str,
+    html: bool = True,
+    cc: Optional[str] = None,
+    bcc: Optional[str] = None,
+) -> str:
+    """Build a message and return it base64url-encoded, as the Gmail API ``raw`` field expects."""
+    raw = build_message(to, sender, display_name, subject, body, html=html, cc=cc, bcc=bcc)
+    # Standard base64 remapped to the URL-safe alphabet in one C-level pass
+    return base64.b64encode(raw).translate(_URLSAFE_B64).decode("ascii")
+
+
+async def send_raw_message(raw: str, token: str) -> dict:
+    """POST a base64url-encoded message to the Gmail API. Returns the API response."""
+    resp = await get_http_client().post(
+        GMAIL_SEND_URL,
+        headers={"Authorization": f"Bearer {token}"},
+        json={"raw": raw},
+    )
+    if resp.status_code >= 400:
+        raise RuntimeError(f"Gmail send failed: {resp.status_code} {resp.text}")
+    return resp.json()
+
+
+_ALLOWED_CONFIG_DIR = "/app/config/gmail"
+
+
+@lru_cache(maxsize=128)
+def _validate_paths(credentials_path: str, token_path: str) -> None:
+    """Raise if either path resolves outside the Gmail config dir.
+
+    Memoized per path pair: the resolver rebuilds providers on every send and
+    realpath stats each path component. Failures are not cached.
+    """
+    for key, raw_path in (("credentials_path", credentials_path), ("token_path", token_path)):
+        path = os.path.realpath(raw_path)
+        if not path.startswith(_ALLOWED_CONFIG_DIR):
+            raise ValueError(f"Gmail {key} must be under {_ALLOWED_CONFIG_DIR}, got: {path}")
+
 
 class GmailProvider(EmailProvider):
     """
-    Gmail provider that uses Google API client with file-based OAuth2 tokens.
+    Gmail provider that calls the Gmail REST API with file-based OAuth2 tokens.
     This is the legacy/default provider for the self-hosted version.
     """
 
@@ -63,13 +120,7 @@ class GmailProvider(EmailProvider):
             "sender_email": str,
         }
         """
-        import os
-
-        allowed_dir = "/app/config/gmail"
-        for key in ("credentials_path", "token_path"):
-            path = os.path.realpath(config[key])
-            if not path.startswith(allowed_dir):
-                raise ValueError(f"Gmail {key} must be under {allowed_dir}, got: {path}")
+        _validate_paths(config["credentials_path"], config["token_path"])
 
         return cls(
             credentials_path=config["credentials_path"],
@@ -77,65 +128,39 @@ class GmailProvider(EmailProvider):
             sender_email=config["sender_email"],
         )
 
-    # Instance-level cache for credentials and service
-    _creds_cache = None
-    _service_cache = None
-
     def _get_credentials(self):
         """Get and refresh Google OAuth2 credentials (synchronous), with caching."""
         from google.auth.transport.requests import Request
         from google.oauth2.credentials import Credentials
 
-        # Return cached creds if still valid
-        if self._creds_cache is not None and self._creds_cache.valid:
-            return self._creds_cache
-
-        scopes = ["https://www.googleapis.com/auth/gmail.send"]
-        token_path = Path(self.token_path)
+        with _creds_lock:
+            # Return cached creds if still valid
+            creds = _creds_by_token_path.get(self.token_path)
+            if creds is not None and creds.valid:
+                return creds
 
-        if not token_path.exists():
-            raise RuntimeError(
-                f"Gmail token not found at {token_path}. "
-                "Run 'python scripts/gmail_auth.py' to authorize."
-            )
+            scopes = ["https://www.googleapis.com/auth/gmail.send"]
+            token_path = Path(self.token_path)
 
-        if self._creds_cache is None:
-            self._creds_cache = Credentials.from_authorized_user_file(str(token_path), scopes)
+            if not token_path.exists():
+                raise RuntimeError(
+                    f"Gmail token not found at {token_path}. "
+                    "Run 'python scripts/gmail_auth.py' to authorize."
+                )
 
-        if self._creds_cache.expired and self._creds_cache.refresh_token:
-            logger.info("Refreshing expired Gmail token")
-            self._creds_cache.refresh(Request())
-            token_path.write_text(self._creds_cache.to_json())
+            if creds is None:
+                creds = Credentials.from_authorized_user_file(str(token_path), scopes)
+                _creds_by_token_path[self.token_path] = creds
 
-        if not self._creds_cache.valid:
-            raise RuntimeError("Gmail credentials are invalid. Re-run gmail_auth.py.")
+            if creds.expired and creds.refresh_token:
+                logger.info("Refreshing expired Gmail token")
+                creds.refresh(Request())
+                token_path.write_text(creds.to_json())
 
-        return self._creds_cache
+            if not creds.valid:
+                raise RuntimeError("Gmail credentials are invalid. Re-run gmail_auth.py.")
 
-    def _send_sync(
-        self,
-        to: str,
-        subject: str,
-        html_body: str,
-        sender_name: Optional[str] = None,
-    ) -> None:
-        """Synchronous send via Google API client, with cached service."""
-        from googleapiclient.discovery import build
-
-        creds = self._get_credentials()
-        if self._service_cache is None:
-            self._service_cache = build("gmail", "v1", credentials=creds, cache_discovery=False)
-        service = self._service_cache
-
-        display_name = sender_name or "HookForms"
-        msg = MIMEText(html_body, "html")
-        msg["to"] = to
-        msg["from"] = f"{display_name} <{self.sender_email}>"
-        msg["subject"] = subject
-
-        raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
-        result = service.users().messages().send(userId="me", body={"raw": raw}).execute()
-        logger.info("Email sent: id=%s to=%s subject=%s", result.get("id"), to, subject)
+            return creds
 
     async def send_email(
         self,
@@ -144,9 +169,18 @@ class GmailProvider(EmailProvider):
         html_body: str,
         sender_name: Optional[str] = None,
     ) -> None:
-        """Send email asynchronously by running sync Gmail API in executor."""
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            partial(self._send_sync, to, subject, html_body, sender_name),
+        """Send email via the Gmail REST API."""
+        creds = _creds_by_token_path.get(self.token_path)
+        if creds is None or not creds.valid:
+            # Loading/refreshing the token is blocking I/O; keep it off the loop
+            creds = await asyncio.to_thread(self._get_credentials)
+
+        raw = build_raw_message(
+            to=to,
+            sender=self.sender_email,
+            display_name=sender_name or "HookForms",
+            subject=subject,
+            body=html_body,
         )
+        result = await send_raw_message(raw, creds.token)
+        logger.info("Email sent: id=%s to=%s subject=%s", result.get("id"), to, subject)
@@ -0,0 +1,31 @@
+"""Shared HTTP client for the REST-based email providers and Turnstile."""
+
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared provider client, creating it on first use.
+
+    Gmail, Resend, SendGrid and Cloudflare Turnstile are fixed, trusted API
+    hosts, so they share one pooled HTTP/2 client instead of opening a
+    connection per request.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=15,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,59 @@
+"""Raw RFC 5322 message construction shared by the Gmail and SMTP providers."""
+
+import base64
+from email.header import Header
+from email.utils import formataddr
+from typing import Optional
+
+# Fixed trailing headers for each body type, built once at import
+_BODY_HEADERS = {
+    html: (
+        "MIME-Version: 1.0\r\n"
+        f"Content-Type: {'text/html' if html else 'text/plain'}; charset=utf-8\r\n"
+        "Content-Transfer-Encoding: base64\r\n"
+        "\r\n"
+    ).encode()
+    for html in (True, False)
+}
+
+
+def _one_line(value: str) -> str:
+    # Header values must stay on one line (no header injection via CR/LF)
+    return value.replace("\r", " ").replace("\n", " ")
+
+
+def _header_value(value: str) -> str:
+    value = _one_line(value)
+    # Non-ASCII text is RFC 2047 encoded; long values fold onto continuation
+    # lines, which must end in CRLF like every other line
+    return value if value.isascii() else Header(value, "utf-8").encode(linesep="\r\n")
+
+
+def build_message(
+    to: str,
+    sender: str,
+    display_name: str,
+    subject: str,
+    body: str,
+    html: bool = True,
+    cc: Optional[str] = None,
+    bcc: Optional[str] = None,
+) -> bytes:
+    """
+    Build a single-part RFC 5322 message as wire-ready bytes.
+
+    Writes the headers directly instead of going through ``email.mime``, which
+    is far more machinery than one body and a handful of headers need. The body
+    is base64 encoded so the message stays 7-bit clean for any SMTP server.
+    """
+    headers = [
+        f"To: {_header_value(to)}",
+        f"From: {formataddr((_one_line(display_name), sender))}",
+        f"Subject: {_header_value(subject)}",
+    ]
+    if cc:
+        headers.append(f"Cc: {_header_value(cc)}")
+    if bcc:
+        headers.append(f"Bcc: {_header_value(bcc)}")
+    encoded_body = base64.encodebytes(body.encode()).replace(b"\n", b"\r\n")
+    return ("\r\n".join(headers) + "\r\n").encode() + _BODY_HEADERS[html] + encoded_body
@@ -3,9 +3,10 @@
 import logging
 from typing import Optional
 
-import httpx
+import orjson
 
 from app.providers.base import EmailProvider
+from app.providers.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -38,22 +39,24 @@ class ResendProvider(EmailProvider):
         display_name = sender_name or "HookForms"
         from_addr = f"{display_name} <{self.from_email}>"
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                "https://api.resend.com/emails",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
+        client = get_http_client()
+        resp = await client.post(
+            "https://api.resend.com/emails",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            content=orjson.dumps(
+                {
                     "from": from_addr,
                     "to": [to],
                     "subject": subject,
                     "html": html_body,
-                },
-            )
+                }
+            ),
+        )
 
-            if resp.status_code >= 400:
-                raise RuntimeError(f"Resend send failed: {resp.status_code} {resp.text}")
+        if resp.status_code >= 400:
+            raise RuntimeError(f"Resend send failed: {resp.status_code} {resp.text}")
 
         logger.info("Email sent via Resend to=%s subject=%s", to, subject)
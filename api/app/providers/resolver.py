@@ -4,7 +4,7 @@ import logging
 import uuid
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.notification import EmailProvider as EmailProviderModel
@@ -30,43 +30,40 @@ async def resolve_email_provider(
       3. Legacy file-based Gmail (from settings)
       4. None (no email provider available)
     """
-    # 1. Try inbox-specific provider
+    # 1 + 2. Inbox-specific or global provider in one round trip; the
+    # inbox-specific row (inbox_id IS NOT NULL) sorts first
     result = await db.execute(
-        select(EmailProviderModel).where(
-            EmailProviderModel.inbox_id == inbox_id,
+        select(EmailProviderModel.type, EmailProviderModel.config)
+        .where(
             EmailProviderModel.is_active.is_(True),
+            or_(
+                EmailProviderModel.inbox_id == inbox_id,
+                EmailProviderModel.inbox_id.is_(None),
+            ),
         )
+        .order_by(EmailProviderModel.inbox_id.is_not(None).desc())
+        .limit(1)
     )
-    specific = result.scalar_one_or_none()
-    if specific:
-        return _build_provider(specific)
-
-    # 2. Try global provider (inbox_id is NULL)
-    result = await db.execute(
-        select(EmailProviderModel).where(
-            EmailProviderModel.inbox_id.is_(None),
-            EmailProviderModel.is_active.is_(True),
-        )
-    )
-    global_provider = result.scalar_one_or_none()
-    if global_provider:
-        return _build_provider(global_provider)
+    row = result.one_or_none()
+    if row:
+        return _build_provider(row.type, row.config)
 
     # 3. Legacy file-based Gmail
     return GmailProvider.from_settings()
 
 
-def _build_provider(record: EmailProviderModel) -> EmailProvider:
-    """Instantiate a provider from a database record."""
-    config = record.config
+# Provider type -> constructor from stored config
+_PROVIDER_FACTORIES = {
+    "gmail": GmailProvider.from_config,
+    "resend": ResendProvider.from_config,
+    "sendgrid": SendGridProvider.from_config,
+    "smtp": SmtpProvider.from_config,
+}
+
 
-    if record.type == "gmail":
-        return GmailProvider.from_config(config)
-    elif record.type == "resend":
-        return ResendProvider.from_config(config)
-    elif record.type == "sendgrid":
-        return SendGridProvider.from_config(config)
-    elif record.type == "smtp":
-        return SmtpProvider.from_config(config)
-    else:
-        raise ValueError(f"Unknown email provider type: {record.type}")
+def _build_provider(provider_type: str, config: dict) -> EmailProvider:
+    """Instantiate a provider from a database record's type and config."""
+    factory = _PROVIDER_FACTORIES.get(provider_type)
+    if factory is None:
+        raise ValueError(f"Unknown email provider type: {provider_type}")
+    return factory(config)
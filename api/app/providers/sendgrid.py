@@ -3,9 +3,10 @@
 import logging
 from typing import Optional
 
-import httpx
+import orjson
 
 from app.providers.base import EmailProvider
+from app.providers.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -37,23 +38,25 @@ class SendGridProvider(EmailProvider):
     ) -> None:
         display_name = sender_name or "HookForms"
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
+        client = get_http_client()
+        resp = await client.post(
+            "https://api.sendgrid.com/v3/mail/send",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            content=orjson.dumps(
+                {
                     "personalizations": [{"to": [{"email": to}]}],
                     "from": {"email": self.from_email, "name": display_name},
                     "subject": subject,
                     "content": [{"type": "text/html", "value": html_body}],
-                },
-            )
+                }
+            ),
+        )
 
-            # SendGrid returns 202 on success
-            if resp.status_code >= 400:
-                raise RuntimeError(f"SendGrid send failed: {resp.status_code} {resp.text}")
+        # SendGrid returns 202 on success
+        if resp.status_code >= 400:
+            raise RuntimeError(f"SendGrid send failed: {resp.status_code} {resp.text}")
 
         logger.info("Email sent via SendGrid to=%s subject=%s", to, subject)
@@ -2,15 +2,47 @@
 
 import asyncio
 import logging
+import queue
 import smtplib
-from email.mime.text import MIMEText
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Optional
 
 from app.providers.base import EmailProvider
+from app.providers.message import build_message
 
 logger = logging.getLogger(__name__)
 
+# Idle authenticated connections kept per server/account, so consecutive sends
+# skip the TCP + STARTTLS + AUTH handshake
+_POOL_SIZE = 4
+_MAX_CONNECTION_AGE = 300  # seconds before a connection is recycled
+
+# smtplib is blocking; sends run on their own bounded executor so an SMTP burst
+# cannot occupy the loop's default thread pool
+_SEND_WORKERS = 8
+_executor = ThreadPoolExecutor(max_workers=_SEND_WORKERS, thread_name_prefix="smtp")
+
+_pools: dict[tuple, queue.SimpleQueue] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(key: tuple) -> queue.SimpleQueue:
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = queue.SimpleQueue()
+        return pool
+
+
+def _close_quietly(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
 
 class SmtpProvider(EmailProvider):
     """Send email via a standard SMTP server."""
@@ -56,6 +88,40 @@ class SmtpProvider(EmailProvider):
             from_email=config["from_email"],
         )
 
+    @property
+    def _pool_key(self) -> tuple:
+        return (self.host, self.port, self.username, self.password, self.use_tls)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            if self.use_tls:
+                server.starttls()
+                server.login(self.username, self.password)
+            elif self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _checkout(self, pool: queue.SimpleQueue) -> tuple[smtplib.SMTP, float]:
+        """Take a live pooled connection, or open a new one."""
+        while True:
+            try:
+                server, opened_at = pool.get_nowait()
+            except queue.Empty:
+                return self._connect(), time.monotonic()
+            if time.monotonic() - opened_at > _MAX_CONNECTION_AGE:
+                _close_quietly(server)
+                continue
+            try:
+                if server.noop()[0] == 250:
+                    return server, opened_at
+            except (smtplib.SMTPException, OSError):
+                pass
+            server.close()
+
     def _send_sync(
         self,
         to: str,
@@ -63,24 +129,29 @@ class SmtpProvider(EmailProvider):
         html_body: str,
         sender_name: Optional[str] = None,
     ) -> None:
-        """Synchronous SMTP send."""
-        display_name = sender_name or "HookForms"
+        """Synchronous SMTP send over a pooled connection."""
+        # Raw bytes go straight to sendmail, skipping email.message policy work
+        msg = build_message(to, self.from_email, sender_name or "HookForms", subject, html_body)
 
-        msg = MIMEText(html_body, "html")
-        msg["Subject"] = subject
-        msg["From"] = f"{display_name} <{self.from_email}>"
-        msg["To"] = to
+        pool = _get_pool(self._pool_key)
+        server, opened_at = self._checkout(pool)
+        try:
+            try:
+                server.sendmail(self.from_email, [to], msg)
+            except smtplib.SMTPServerDisconnected:
+                # The pooled connection went away between the liveness check
+                # and the send; retry once on a fresh one
+                server.close()
+                server, opened_at = self._connect(), time.monotonic()
+                server.sendmail(self.from_email, [to], msg)
+        except Exception:
+            _close_quietly(server)
+            raise
 
-        if self.use_tls:
-            with smtplib.SMTP(self.host, self.port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(msg)
+        if pool.qsize() < _POOL_SIZE:
+            pool.put((server, opened_at))
         else:
-            with smtplib.SMTP(self.host, self.port) as server:
-                if self.username:
-                    server.login(self.username, self.password)
-                server.send_message(msg)
+            _close_quietly(server)
 
         logger.info("Email sent via SMTP to=%s subject=%s", to, subject)
 
@@ -91,9 +162,9 @@ class SmtpProvider(EmailProvider):
         html_body: str,
         sender_name: Optional[str] = None,
     ) -> None:
-        """Send email asynchronously by running sync SMTP in executor."""
+        """Send email asynchronously by running sync SMTP on the SMTP executor."""
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(
-            None,
+            _executor,
             partial(self._send_sync, to, subject, html_body, sender_name),
         )
@@ -1,9 +1,46 @@
+import time
+
+from cachetools import TTLCache
 from redis.asyncio import Redis
 
 from app.config import settings
 
 redis = Redis.from_url(settings.redis_url, decode_responses=True)
 
+# Fixed-window counter: INCR and start the window's TTL on the first hit, in
+# one atomic EVALSHA. Call with keys=[counter], args=[window_seconds].
+incr_window = redis.register_script(
+    """
+    local c = redis.call('INCR', KEYS[1])
+    if c == 1 then redis.call('EXPIRE', KEYS[1], ARGV[1]) end
+    return c
+    """
+)
+
+
+# Windows this process has seen go over their limit: key -> monotonic time the
+# window ends. Bounded so keys that stop being hit age out.
+_saturated: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+
+
+async def window_exceeded(key: str, limit: int, window: int) -> bool:
+    """Count a hit in a fixed window and report whether it is over ``limit``.
+
+    Once a window is over its limit, this process answers from memory until the
+    window ends, so a saturated key costs no Redis round trip per hit.
+    """
+    until = _saturated.get(key)
+    if until is not None:
+        if time.monotonic() < until:
+            return True
+        _saturated.pop(key, None)
+    count = await incr_window(keys=[key], args=[window])
+    if count <= limit:
+        return False
+    ttl_ms = await redis.pttl(key)
+    _saturated[key] = time.monotonic() + (ttl_ms / 1000 if ttl_ms > 0 else window)
+    return True
+
 
 async def get_redis() -> Redis:
     return redis
@@ -1,22 +1,23 @@
 """Standard response envelope for the HookForms API."""
 
-from typing import Any, Sequence
+from typing import Any, Optional, Sequence
 
 
 def paginated_response(
     items: Sequence[Any],
-    total: int,
+    total: Optional[int],
     limit: int,
     offset: int,
+    next_cursor: Optional[str] = None,
 ) -> dict:
-    return {
-        "data": items,
-        "meta": {
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-        },
+    meta = {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
     }
+    if next_cursor is not None:
+        meta["next_cursor"] = next_cursor
+    return {"data": items, "meta": meta}
 
 
 def single_response(item: Any) -> dict:
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import generate_key, hash_key, require_scope
+from app.auth import forget_key, generate_key, hash_key, require_scope, scope_bits
 from app.database import get_db
 from app.models.api_key import ApiKey
 from app.response import paginated_response, single_response
@@ -10,6 +11,9 @@ from app.schemas.auth import ApiKeyCreate, ApiKeyCreated, ApiKeyResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Built once: validates a whole page of keys in a single call
+_KEY_LIST = TypeAdapter(list[ApiKeyResponse])
+
 
 @router.post("/keys", status_code=201, summary="Create an API key")
 async def create_key(
@@ -17,16 +21,21 @@ async def create_key(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("admin")),
 ):
-    raw_key = generate_key()
-    db_key = ApiKey(
-        name=body.name,
-        key_hash=hash_key(raw_key),
-        key_prefix=raw_key[:12],
-        scopes=body.scopes,
+    raw_key, key_prefix = generate_key()
+    # RETURNING brings back the server-defaulted timestamps without a refresh
+    result = await db.execute(
+        insert(ApiKey)
+        .values(
+            name=body.name,
+            key_sha256=hash_key(raw_key),
+            key_prefix=key_prefix,
+            scopes=body.scopes,
+            scopes_bits=scope_bits(body.scopes),
+        )
+        .returning(ApiKey)
     )
-    db.add(db_key)
+    db_key = result.scalar_one()
     await db.commit()
-    await db.refresh(db_key)
 
     resp = ApiKeyResponse.model_validate(db_key)
     result = ApiKeyCreated(**resp.model_dump(), raw_key=raw_key)
@@ -40,11 +49,22 @@ async def list_keys(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("admin")),
 ):
-    total = (await db.execute(select(func.count()).select_from(ApiKey))).scalar()
+    # Page and total in one query; the window count is taken before LIMIT/OFFSET
     result = await db.execute(
-        select(ApiKey).order_by(ApiKey.created_at.desc()).limit(limit).offset(offset)
+        select(ApiKey, func.count().over().label("total"))
+        .order_by(ApiKey.created_at.desc())
+        .limit(limit)
+        .offset(offset)
     )
-    items = [ApiKeyResponse.model_validate(k) for k in result.scalars().all()]
+    rows = result.all()
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page: no rows to carry the window count
+        total = (await db.execute(select(func.count()).select_from(ApiKey))).scalar()
+    else:
+        total = 0
+    items = _KEY_LIST.validate_python([row.ApiKey for row in rows], from_attributes=True)
     return paginated_response(items, total, limit, offset)
 
 
@@ -60,3 +80,4 @@ async def revoke_key(
         raise HTTPException(status_code=404, detail="API key not found")
     db_key.is_active = False
     await db.commit()
+    forget_key(db_key.key_sha256)
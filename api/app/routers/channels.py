@@ -2,37 +2,42 @@
 
 import logging
 from pathlib import Path
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, delete
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import require_scope
 from app.channels.detect import detect_channel_type
 from app.channels.validate import (
+    VALID_CHANNEL_TYPES,
+    VALID_PROVIDER_TYPES,
+    suggest_channel_type,
     validate_channel_config,
     validate_provider_config,
-    suggest_channel_type,
 )
 from app.config import settings
 from app.database import get_db
-from app.models.notification import NotificationChannel, EmailProvider
+from app.inbox_cache import invalidate_inbox
+from app.models.notification import EmailProvider, NotificationChannel
 from app.models.webhook import WebhookInbox
 from app.response import single_response
 from app.schemas.channel import (
     ChannelCreate,
-    ChannelUpdate,
     ChannelResponse,
-    EmailProviderUpsert,
+    ChannelUpdate,
     EmailProviderResponse,
+    EmailProviderUpsert,
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/hooks", tags=["channels"])
 
-VALID_CHANNEL_TYPES = {"email", "discord", "slack", "teams", "telegram", "ntfy", "webhook"}
-VALID_PROVIDER_TYPES = {"gmail", "resend", "sendgrid", "smtp"}
+# Built once: validates all of an inbox's channels in a single call
+_CHANNEL_LIST = TypeAdapter(list[ChannelResponse])
 
 
 def _redact_config(config: dict) -> dict:
@@ -52,15 +57,16 @@ def _redact_config(config: dict) -> dict:
 
 
 # ---------------------------------------------------------------------------
-# Helper: resolve inbox by slug
+# Helper: resolve inbox id by slug
 # ---------------------------------------------------------------------------
 
-async def _get_inbox(slug: str, db: AsyncSession) -> WebhookInbox:
-    result = await db.execute(select(WebhookInbox).where(WebhookInbox.slug == slug))
-    inbox = result.scalar_one_or_none()
-    if not inbox:
+async def _get_inbox_id(slug: str, db: AsyncSession) -> UUID:
+    # Only the id is selected, so the covering slug index answers it index-only
+    result = await db.execute(select(WebhookInbox.id).where(WebhookInbox.slug == slug))
+    inbox_id = result.scalar_one_or_none()
+    if not inbox_id:
         raise HTTPException(status_code=404, detail="Inbox not found")
-    return inbox
+    return inbox_id
 
 
 # ---------------------------------------------------------------------------
@@ -74,13 +80,14 @@ async def create_channel(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    inbox = await _get_inbox(slug, db)
+    inbox_id = await _get_inbox_id(slug, db)
 
-    channel_type = body.type
+    # Types are matched case-insensitively and stored lower-case
+    channel_type = body.type.lower()
     if channel_type not in VALID_CHANNEL_TYPES:
         suggestion = suggest_channel_type(channel_type)
         hint = f" Did you mean '{suggestion}'?" if suggestion else ""
-        raise HTTPException(status_code=400, detail=f"Invalid channel type: {channel_type}.{hint}")
+        raise HTTPException(status_code=400, detail=f"Invalid channel type: {body.type}.{hint}")
 
     # Auto-detect webhook URL type (check both 'url' and 'webhook_url' keys)
     if channel_type == "webhook":
@@ -96,7 +103,7 @@ async def create_channel(
         raise HTTPException(status_code=400, detail=config_error)
 
     channel = NotificationChannel(
-        inbox_id=inbox.id,
+        inbox_id=inbox_id,
         type=channel_type,
         label=body.label,
         config=body.config,
@@ -105,6 +112,7 @@ async def create_channel(
     db.add(channel)
     await db.commit()
     await db.refresh(channel)
+    await invalidate_inbox(slug)
 
     return single_response(ChannelResponse.model_validate(channel))
 
@@ -115,18 +123,16 @@ async def list_channels(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    inbox = await _get_inbox(slug, db)
+    inbox_id = await _get_inbox_id(slug, db)
 
     result = await db.execute(
         select(NotificationChannel)
-        .where(NotificationChannel.inbox_id == inbox.id)
+        .where(NotificationChannel.inbox_id == inbox_id)
         .order_by(NotificationChannel.created_at.desc())
     )
-    items = []
-    for ch in result.scalars().all():
-        resp = ChannelResponse.model_validate(ch)
+    items = _CHANNEL_LIST.validate_python(result.scalars().all(), from_attributes=True)
+    for resp in items:
         resp.config = _redact_config(resp.config)
-        items.append(resp)
     return {"data": items}
 
 
@@ -138,53 +144,68 @@ async def update_channel(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    inbox = await _get_inbox(slug, db)
+    inbox_id = await _get_inbox_id(slug, db)
 
-    result = await db.execute(
-        select(NotificationChannel).where(
-            NotificationChannel.id == channel_id,
-            NotificationChannel.inbox_id == inbox.id,
-        )
+    update_data = body.model_dump(exclude_unset=True)
+    if "type" in update_data:
+        channel_type = update_data["type"].lower()
+        if channel_type not in VALID_CHANNEL_TYPES:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid channel type: {update_data['type']}"
+            )
+        update_data["type"] = channel_type
+
+    match = (
+        NotificationChannel.id == channel_id,
+        NotificationChannel.inbox_id == inbox_id,
     )
+    if update_data:
+        # One round trip: the updated row comes back via RETURNING
+        stmt = (
+            update(NotificationChannel)
+            .where(*match)
+            .values(**update_data)
+            .returning(NotificationChannel)
+        )
+    else:
+        stmt = select(NotificationChannel).where(*match)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
     channel = result.scalar_one_or_none()
     if not channel:
         raise HTTPException(status_code=404, detail="Channel not found")
-
-    update_data = body.model_dump(exclude_unset=True)
-    if "type" in update_data:
-        if update_data["type"] not in VALID_CHANNEL_TYPES:
-            raise HTTPException(status_code=400, detail=f"Invalid channel type: {update_data['type']}")
-
-    for field, value in update_data.items():
-        setattr(channel, field, value)
-
     await db.commit()
-    await db.refresh(channel)
+    if update_data:
+        await invalidate_inbox(slug)
 
     return single_response(ChannelResponse.model_validate(channel))
 
 
-@router.delete("/inboxes/{slug}/channels/{channel_id}", status_code=204, summary="Remove a notification channel")
+@router.delete(
+    "/inboxes/{slug}/channels/{channel_id}",
+    status_code=204,
+    summary="Remove a notification channel",
+)
 async def delete_channel(
     slug: str,
     channel_id: str,
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    inbox = await _get_inbox(slug, db)
+    inbox_id = await _get_inbox_id(slug, db)
 
+    # Existence check and delete in one statement
     result = await db.execute(
-        select(NotificationChannel).where(
+        delete(NotificationChannel)
+        .where(
             NotificationChannel.id == channel_id,
-            NotificationChannel.inbox_id == inbox.id,
+            NotificationChannel.inbox_id == inbox_id,
         )
+        .returning(NotificationChannel.id)
     )
-    channel = result.scalar_one_or_none()
-    if not channel:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Channel not found")
-
-    await db.delete(channel)
     await db.commit()
+    await invalidate_inbox(slug)
 
 
 # ---------------------------------------------------------------------------
@@ -199,8 +220,7 @@ async def get_email_provider(
 ):
     inbox_id = None
     if inbox:
-        inbox_obj = await _get_inbox(inbox, db)
-        inbox_id = inbox_obj.id
+        inbox_id = await _get_inbox_id(inbox, db)
 
     if inbox_id:
         result = await db.execute(
@@ -238,18 +258,18 @@ async def set_email_provider(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    if body.type not in VALID_PROVIDER_TYPES:
+    provider_type = body.type.lower()
+    if provider_type not in VALID_PROVIDER_TYPES:
         raise HTTPException(status_code=400, detail=f"Invalid provider type: {body.type}")
 
     # Validate provider config
-    provider_error = validate_provider_config(body.type, body.config)
+    provider_error = validate_provider_config(provider_type, body.config)
     if provider_error:
         raise HTTPException(status_code=400, detail=provider_error)
 
     inbox_id = None
     if body.inbox:
-        inbox_obj = await _get_inbox(body.inbox, db)
-        inbox_id = inbox_obj.id
+        inbox_id = await _get_inbox_id(body.inbox, db)
 
     # Delete existing provider for this scope
     if inbox_id:
@@ -263,7 +283,7 @@ async def set_email_provider(
 
     provider = EmailProvider(
         inbox_id=inbox_id,
-        type=body.type,
+        type=provider_type,
         config=body.config,
         is_active=True,
     )
@@ -274,16 +294,21 @@ async def set_email_provider(
     return {"data": EmailProviderResponse.model_validate(provider)}
 
 
-@router.delete("/config/email-provider", status_code=204, summary="Remove email provider config", tags=["email-providers"])
+@router.delete(
+    "/config/email-provider",
+    status_code=204,
+    summary="Remove email provider config",
+    tags=["email-providers"],
+)
 async def delete_email_provider(
     inbox: str = Query(None, description="Inbox slug (omit for global)"),
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
     if inbox:
-        inbox_obj = await _get_inbox(inbox, db)
+        inbox_id = await _get_inbox_id(inbox, db)
         await db.execute(
-            delete(EmailProvider).where(EmailProvider.inbox_id == inbox_obj.id)
+            delete(EmailProvider).where(EmailProvider.inbox_id == inbox_id)
         )
     else:
         await db.execute(
@@ -1,33 +1,197 @@
+import asyncio
+import base64
 import html
 import logging
-
-from app.channels.format_value import format_value
-
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Optional
+
+import httpx
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select, func, update
+from sqlalchemy import delete, func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.auth import require_scope
+from app.channels import HOOK_PATH_PREFIX, iter_fields
 from app.channels.dispatcher import dispatch_notifications
-from app.database import get_db
+from app.channels.format_value import format_value, pretty_label, spaced_label
+from app.database import async_session, get_db
+from app.event_queue import enqueue_event, insert_event, new_event_id
+from app.inbox_cache import cache_inbox, get_cached_inbox, invalidate_inbox
+from app.mail import send_email
+from app.middleware import RequestSizeLimitMiddleware
 from app.models.notification import NotificationChannel
-from app.models.webhook import WebhookInbox, WebhookEvent
+from app.models.webhook import WebhookEvent, WebhookInbox
+from app.providers.http import get_http_client
 from app.providers.resolver import resolve_email_provider
-from app.redis import redis as redis_client
+from app.redis import window_exceeded
 from app.response import paginated_response, single_response
 from app.schemas.webhook import (
+    WebhookEventResponse,
     WebhookInboxCreate,
-    WebhookInboxUpdate,
     WebhookInboxResponse,
-    WebhookEventResponse,
+    WebhookInboxUpdate,
 )
-from app.security import is_safe_url, safe_http_client
+from app.security import get_safe_client, is_safe_url
 
 wh_logger = logging.getLogger("webhooks")
 
+
+TURNSTILE_VERIFY_URL = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
+
+# In-flight background notification tasks (referenced so they aren't GC'd early)
+_notify_tasks: set[asyncio.Task] = set()
+
+# Query string kept with an event: first N parameters, values clipped
+_MAX_QUERY_PARAMS = 32
+_MAX_QUERY_VALUE = 1024
+
+# Bytes of a non-JSON, non-form body kept as event text
+_MAX_RAW_TEXT = 64 * 1024
+
+# Transport and proxy headers that say nothing about the webhook itself, and
+# credentials that should not sit in event rows; they are not stored with
+# events (Starlette yields header names lower-cased)
+_DROPPED_HEADERS = frozenset({
+    "accept-encoding",
+    "authorization",
+    "cdn-loop",
+    "cf-ipcountry",
+    "cf-ray",
+    "cf-visitor",
+    "connection",
+    "content-length",
+    "cookie",
+    "keep-alive",
+    "te",
+    "upgrade",
+    "via",
+    "x-forwarded-host",
+    "x-forwarded-port",
+    "x-forwarded-proto",
+    "x-real-ip",
+    "x-request-start",
+})
+
 router = APIRouter(prefix="/hooks", tags=["webhooks"])
 public_router = APIRouter(tags=["webhooks-public"])
 
+_EMAIL_LABEL_STYLE = (
+    "padding:10px 14px;font-weight:600;color:#555;"
+    "white-space:nowrap;vertical-align:top;border-bottom:1px solid #eee;"
+)
+_EMAIL_VALUE_STYLE = "padding:10px 14px;color:#222;border-bottom:1px solid #eee;"
+
+_EMAIL_ROW_TEMPLATE = (
+    f'<tr><td style="{_EMAIL_LABEL_STYLE}">{{label}}</td>'
+    f'<td style="{_EMAIL_VALUE_STYLE}">{{value}}</td></tr>'
+)
+
+_EMAIL_REPLY_TEMPLATE = (
+    '<tr><td style="padding:0 32px 24px;"><a href="mailto:{email}" '
+    'style="display:inline-block;padding:10px 20px;background:#1a1a2e;color:#fff;'
+    'text-decoration:none;border-radius:5px;font-size:14px;">Reply to {name}</a></td></tr>'
+)
+
+# Legacy notify_email body, formatted per submission (a trailing backslash joins
+# a long line to the next without adding a newline)
+_EMAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"></head>
+<body style="margin:0;padding:0;background:#f4f5f7;\
+font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Helvetica,Arial,sans-serif;">
+  <table width="100%" cellpadding="0" cellspacing="0" style="background:#f4f5f7;padding:32px 0;">
+    <tr><td align="center">
+      <table width="600" cellpadding="0" cellspacing="0" style="background:#ffffff;\
+border-radius:8px;overflow:hidden;box-shadow:0 2px 8px rgba(0,0,0,0.08);">
+        <tr>
+          <td style="background:#1a1a2e;padding:24px 32px;">
+            <h1 style="margin:0;color:#ffffff;font-size:20px;font-weight:600;">\
+{prefix} {subject_detail}</h1>
+          </td>
+        </tr>
+        <tr>
+          <td style="padding:24px 32px;">
+            <p style="margin:0 0 16px;color:#666;font-size:14px;">\
+A new form submission was received:</p>
+            <table width="100%" cellpadding="0" cellspacing="0" style="border:1px solid #eee;\
+border-radius:6px;overflow:hidden;">
+              {field_rows}
+            </table>
+          </td>
+        </tr>
+        {reply_button}
+        <tr>
+          <td style="padding:16px 32px;background:#fafafa;border-top:1px solid #eee;">
+            <p style="margin:0;color:#999;font-size:12px;">\
+Delivered by {footer_name} &middot; <code style="background:#eee;padding:2px 6px;border-radius:3px;\
+font-size:11px;">/hooks/{slug_escaped}</code></p>
+          </td>
+        </tr>
+      </table>
+    </td></tr>
+  </table>
+</body>
+</html>"""
+
+
+@lru_cache(maxsize=4096)
+def _escaped_inbox_meta(
+    subject_prefix: Optional[str], slug: str, sender_name: Optional[str]
+) -> tuple[str, str, str]:
+    """HTML-escaped subject prefix, slug and footer name for an inbox's emails.
+
+    Keyed on the values themselves, so an edited inbox simply misses the cache.
+    """
+    return (
+        html.escape(subject_prefix or f"[{slug}]"),
+        html.escape(slug),
+        html.escape(sender_name or "HookForms"),
+    )
+
+
+def _encode_event_cursor(received_at: datetime, event_id: uuid.UUID) -> str:
+    raw = f"{received_at.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_event_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        received_at, event_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.fromisoformat(received_at), uuid.UUID(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _without_nul(value):
+    """Copy of a parsed body with NUL characters removed from its strings.
+
+    jsonb cannot store NUL (\\u0000), so an event carrying one would be
+    rejected by Postgres after the sender had been told it was received.
+    """
+    if isinstance(value, str):
+        return value.replace("\x00", "")
+    if isinstance(value, dict):
+        return {_without_nul(k): _without_nul(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_without_nul(item) for item in value]
+    return value
+
+
+def _forward_kind(forward_url: Optional[str]) -> Optional[str]:
+    """Classify a forward_url once, when it is stored, for the legacy forwarder."""
+    if not forward_url:
+        return None
+    if "discord.com/api/webhooks" in forward_url:
+        return "discord"
+    if "hooks.slack.com/" in forward_url:
+        return "slack"
+    return "generic"
+
 
 # ---------------------------------------------------------------------------
 # Public: receive webhooks
@@ -40,264 +204,338 @@ public_router = APIRouter(tags=["webhooks-public"])
     summary="Receive a webhook",
 )
 async def receive_webhook(slug: str, request: Request, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(WebhookInbox).where(WebhookInbox.slug == slug, WebhookInbox.is_active.is_(True))
-    )
-    inbox = result.scalar_one_or_none()
-    if not inbox:
-        raise HTTPException(status_code=404, detail="Inbox not found")
+    inbox = get_cached_inbox(slug)
+    if inbox is None:
+        # Active channels come back with the inbox (one SELECT ... IN follow-up),
+        # so dispatch needs no query of its own
+        result = await db.execute(
+            select(WebhookInbox)
+            .options(
+                selectinload(WebhookInbox.channels.and_(NotificationChannel.is_active.is_(True)))
+            )
+            .where(WebhookInbox.slug == slug, WebhookInbox.is_active.is_(True))
+        )
+        inbox = result.scalar_one_or_none()
+        if not inbox:
+            raise HTTPException(status_code=404, detail="Inbox not found")
+        cache_inbox(inbox)
 
-    # Parse body — try JSON first, then form-encoded, then raw bytes
+    # Parse body — form posts go straight to the form parser; anything else is
+    # read once and tried as JSON, then kept as raw text
     body = None
+    # Original bytes of a JSON body, forwarded verbatim by the legacy generic
+    # forward so signed payloads keep verifying (None if the body is reshaped)
+    forward_raw: Optional[bytes] = None
     content_type = request.headers.get("content-type", "")
-    try:
-        body = await request.json()
-    except Exception:
-        if "application/x-www-form-urlencoded" in content_type or "multipart/form-data" in content_type:
-            try:
-                form = await request.form()
-                body = {k: v for k, v in form.items() if isinstance(v, str)}
-            except Exception:
-                pass
-        if body is None:
+    if "application/x-www-form-urlencoded" in content_type or "multipart/form-data" in content_type:
+        try:
+            form = await request.form()
+            # multi_items() is the parsed pair list itself; uploads are dropped
+            body = dict(
+                item for item in form.multi_items() if isinstance(item[1], str)
+            )
+            if any("\x00" in key or "\x00" in value for key, value in body.items()):
+                body = _without_nul(body)
+        except Exception:
+            pass
+    if body is None:
+        try:
+            raw = await request.body()
+        except Exception:
+            raw = b""
+        # Content-Length is checked by middleware; this also catches chunked bodies
+        if len(raw) > RequestSizeLimitMiddleware.MAX_BODY_SIZE:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        if raw:
             try:
-                raw = await request.body()
-                if raw:
-                    body = {"raw": raw.decode("utf-8", errors="replace")}
-            except Exception:
-                pass
+                body = orjson.loads(raw)
+                forward_raw = raw
+                # A NUL can only arrive escaped in JSON text
+                if b"\\u0000" in raw:
+                    body = _without_nul(body)
+            except orjson.JSONDecodeError:
+                # Only the head of a large non-JSON body is decoded and stored
+                text = raw[:_MAX_RAW_TEXT].decode("utf-8", errors="replace")
+                body = {"raw": text.replace("\x00", "")}
+                if len(raw) > _MAX_RAW_TEXT:
+                    body["raw_truncated"] = True
 
     # Optional: Cloudflare Turnstile verification
     if inbox.turnstile_secret and body and isinstance(body, dict):
         turnstile_token = body.pop("cf-turnstile-response", None)
+        forward_raw = None
         if not turnstile_token:
             raise HTTPException(status_code=400, detail="Missing Turnstile verification token")
-        import httpx
-
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                verify_resp = await client.post(
-                    "https://challenges.cloudflare.com/turnstile/v0/siteverify",
-                    data={
-                        "secret": inbox.turnstile_secret,
-                        "response": turnstile_token,
-                        "remoteip": request.headers.get("cf-connecting-ip", ""),
-                    },
-                )
-                verify_result = verify_resp.json()
-                if not verify_result.get("success"):
-                    raise HTTPException(status_code=403, detail="Turnstile verification failed")
+            # Shared pooled client: keeps the TLS connection to Cloudflare warm
+            verify_resp = await get_http_client().post(
+                TURNSTILE_VERIFY_URL,
+                data={
+                    "secret": inbox.turnstile_secret,
+                    "response": turnstile_token,
+                    "remoteip": request.headers.get("cf-connecting-ip", ""),
+                },
+                timeout=10,
+            )
+            verify_result = verify_resp.json()
+            if not verify_result.get("success"):
+                raise HTTPException(status_code=403, detail="Turnstile verification failed")
         except httpx.HTTPError:
             raise HTTPException(status_code=503, detail="Turnstile verification unavailable")
 
-    event = WebhookEvent(
-        inbox_id=inbox.id,
-        method=request.method,
-        headers=dict(request.headers),
-        body=body,
-        query_params=dict(request.query_params),
-        source_ip=request.client.host if request.client else None,
-    )
-    db.add(event)
-    await db.commit()
+    event_row = {
+        "id": new_event_id(),
+        "inbox_id": inbox.id,
+        "method": request.method,
+        "headers": {k: v for k, v in request.headers.items() if k not in _DROPPED_HEADERS},
+        "body": body,
+        "query_params": {
+            k: v[:_MAX_QUERY_VALUE]
+            for k, v in islice(request.query_params.multi_items(), _MAX_QUERY_PARAMS)
+        },
+        "source_ip": request.client.host if request.client else None,
+        "received_at": datetime.now(timezone.utc),
+    }
+    event_id = str(event_row["id"])
+    try:
+        # Persisted in batches by the event flusher (at least once: see
+        # app.event_queue)
+        await enqueue_event(event_row)
+    except Exception:
+        # Not queued, so write it now; the sender gets an error if this fails
+        wh_logger.warning("Event queue unavailable, inserting /hooks/%s event directly", slug)
+        await insert_event(db, event_row)
 
-    # Dispatch notifications via channels or legacy fields
+    # Notifications run after the response: the sender only needs to know
+    # the event was accepted
     if body:
-        # Check if this inbox has any notification channel rows
-        channel_count = (
-            await db.execute(
-                select(func.count()).select_from(NotificationChannel).where(
-                    NotificationChannel.inbox_id == inbox.id,
-                    NotificationChannel.is_active.is_(True),
-                )
+        task = asyncio.create_task(
+            _notify(
+                inbox,
+                slug,
+                body,
+                request.method,
+                event_row["received_at"],
+                forward_raw,
+                content_type,
             )
-        ).scalar() or 0
+        )
+        _notify_tasks.add(task)
+        task.add_done_callback(_notify_tasks.discard)
+
+    return {"status": "received", "event_id": event_id}
+
+
+async def _notify(
+    inbox: WebhookInbox,
+    slug: str,
+    body,
+    method: str,
+    received_at: datetime,
+    raw: Optional[bytes] = None,
+    content_type: str = "",
+) -> None:
+    """Background task: run the fan-out, logging anything it lets escape."""
+    try:
+        await _fan_out(inbox, slug, body, method, received_at, raw, content_type)
+    except Exception:
+        wh_logger.exception("Notification failed for /hooks/%s", slug)
+
+
+async def drain_notifications(timeout: float = 10) -> None:
+    """Wait (bounded) for in-flight notification tasks, e.g. at shutdown."""
+    if _notify_tasks:
+        await asyncio.wait(set(_notify_tasks), timeout=timeout)
 
-        if channel_count > 0:
-            # Use the new channel dispatcher
-            try:
-                # Load active channels
-                channel_result = await db.execute(
-                    select(NotificationChannel).where(
-                        NotificationChannel.inbox_id == inbox.id,
-                        NotificationChannel.is_active.is_(True),
-                    )
-                )
-                channels = list(channel_result.scalars().all())
 
-                # Resolve email provider for this inbox
+async def _fan_out(
+    inbox: WebhookInbox,
+    slug: str,
+    body,
+    method: str,
+    received_at: datetime,
+    raw: Optional[bytes] = None,
+    content_type: str = "",
+) -> None:
+    """Fan a received webhook out to its channels, or the legacy forward/email."""
+    # No active channel rows means the legacy fields apply
+    channels = inbox.channels
+    if channels:
+        # Use the new channel dispatcher
+        try:
+            # Resolve email provider for this inbox (the request's session
+            # is closed by the time this runs)
+            async with async_session() as db:
                 email_provider = await resolve_email_provider(db, inbox.id)
 
-                await dispatch_notifications(inbox, channels, body, email_provider)
-            except Exception:
-                wh_logger.exception("Notification dispatch failed for /hooks/%s", slug)
-        else:
-            # Legacy: forward_url + notify_email (backward compat for inboxes without channel rows)
-            if inbox.forward_url:
-                try:
-                    is_discord = "discord.com/api/webhooks" in inbox.forward_url
-                    is_slack = "hooks.slack.com/" in inbox.forward_url
-
-                    if is_discord and isinstance(body, dict):
-                        fields = []
-                        for k, v in body.items():
-                            if v and k != "cf-turnstile-response":
-                                formatted = format_value(v, 1024)
-                                fields.append({
-                                    "name": k.replace("_", " ").title(),
-                                    "value": formatted[:1024],
-                                    "inline": len(formatted) < 50,
-                                })
-                        forward_body = {
-                            "embeds": [
-                                {
-                                    "title": f"{inbox.email_subject_prefix or f'[{slug}]'} New Submission",
-                                    "color": 0xD4A843,
-                                    "fields": fields,
-                                    "footer": {"text": f"hookforms/hooks/{slug}"},
-                                    "timestamp": __import__("datetime").datetime.now(
-                                        __import__("datetime").timezone.utc
-                                    ).isoformat(),
-                                }
-                            ]
-                        }
-                        async with safe_http_client(timeout=10) as client:
-                            await client.post(
-                                inbox.forward_url,
-                                json=forward_body,
-                                headers={"X-Forwarded-From": f"hookforms/hooks/{slug}"},
-                            )
-                    elif is_slack and isinstance(body, dict):
-                        lines = [
-                            f"*{k.replace('_', ' ')}:* {format_value(v)}"
-                            for k, v in body.items()
-                            if v and k != "cf-turnstile-response"
+            await dispatch_notifications(inbox, channels, body, email_provider)
+        except Exception:
+            wh_logger.exception("Notification dispatch failed for /hooks/%s", slug)
+    else:
+        # Legacy: forward_url + notify_email (backward compat for inboxes without channel rows)
+        fields = iter_fields(body) if isinstance(body, dict) else []
+        # Default-length display text, formatted once for the Slack forward
+        # and the notification email
+        displayed = (
+            [(k, format_value(v)) for k, v in fields]
+            if inbox.notify_email or inbox.forward_kind == "slack"
+            else []
+        )
+
+        if inbox.forward_url:
+            hook_path = f"{HOOK_PATH_PREFIX}{slug}"
+            forward_headers = {"X-Forwarded-From": hook_path}
+            # Shared SSRF-safe client (10s timeout, redirects re-checked per hop)
+            client = get_safe_client()
+            try:
+                is_discord = inbox.forward_kind == "discord"
+                is_slack = inbox.forward_kind == "slack"
+
+                if is_discord and isinstance(body, dict):
+                    embed_fields = []
+                    for k, v in fields:
+                        formatted = format_value(v, 1024, clip=True)
+                        embed_fields.append({
+                            "name": pretty_label(k),
+                            "value": formatted,
+                            "inline": len(formatted) < 50,
+                        })
+                    forward_body = {
+                        "embeds": [
+                            {
+                                "title": (
+                                    f"{inbox.email_subject_prefix or f'[{slug}]'} New Submission"
+                                ),
+                                "color": 0xD4A843,
+                                "fields": embed_fields,
+                                "footer": {"text": hook_path},
+                                "timestamp": received_at.isoformat(),
+                            }
                         ]
-                        forward_body = {
-                            "text": f"{inbox.email_subject_prefix or f'[{slug}]'} New Submission",
-                            "blocks": [
-                                {
-                                    "type": "section",
-                                    "text": {"type": "mrkdwn", "text": "\n".join(lines)},
-                                }
-                            ],
-                        }
-                        async with safe_http_client(timeout=10) as client:
-                            await client.post(
-                                inbox.forward_url,
-                                json=forward_body,
-                                headers={"X-Forwarded-From": f"hookforms/hooks/{slug}"},
-                            )
-                    else:
-                        async with safe_http_client(timeout=10, follow_redirects=True) as client:
-                            await client.request(
-                                method=request.method,
-                                url=inbox.forward_url,
-                                json=body,
-                                headers={"X-Forwarded-From": f"hookforms/hooks/{slug}"},
-                            )
-                except Exception:
-                    wh_logger.exception("Forwarding failed for /hooks/%s", slug)
-
-            if inbox.notify_email:
-                # Per-inbox rate limit: max 10 emails per 10 minutes
-                rate_key = f"webhook_email_rate:{inbox.id}"
-                try:
-                    email_count = await redis_client.incr(rate_key)
-                    if email_count == 1:
-                        await redis_client.expire(rate_key, 600)
-                    if email_count > 10:
-                        wh_logger.warning("Email rate limit hit for inbox %s", slug)
-                        return {"status": "received", "event_id": str(event.id)}
-                except Exception:
-                    wh_logger.warning("Email rate limiter unavailable for inbox %s", slug)
-
-                try:
-                    import asyncio
-                    from functools import partial
-                    from app.mail import send_email
-
-                    prefix = html.escape(inbox.email_subject_prefix or f"[{slug}]")
-                    slug_escaped = html.escape(slug)
-                    inbox_sender_name = inbox.sender_name
-
-                    sender_name = html.escape(str(body.get("name", "Unknown")))
-                    sender_email_raw = str(body.get("email", ""))
-                    sender_email = html.escape(sender_email_raw)
-                    subject_detail = f"from {sender_name}" if sender_name != "Unknown" else "New Submission"
-
-                    field_rows = ""
-                    skip_keys = {"raw", "source", "cf-turnstile-response"}
-                    for key, val in body.items():
-                        if key in skip_keys or not val:
-                            continue
-                        label = html.escape(key.replace("_", " ").title())
-                        escaped_val = html.escape(format_value(val))
-                        field_rows += (
-                            f"<tr>"
-                            f'<td style="padding:10px 14px;font-weight:600;color:#555;'
-                            f'white-space:nowrap;vertical-align:top;border-bottom:1px solid #eee;">{label}</td>'
-                            f'<td style="padding:10px 14px;color:#222;border-bottom:1px solid #eee;">{escaped_val}</td>'
-                            f"</tr>"
-                        )
+                    }
+                    await client.post(
+                        inbox.forward_url,
+                        json=forward_body,
+                        headers=forward_headers,
+                    )
+                elif is_slack and isinstance(body, dict):
+                    lines = [f"*{spaced_label(k)}:* {text}" for k, text in displayed]
+                    forward_body = {
+                        "text": f"{inbox.email_subject_prefix or f'[{slug}]'} New Submission",
+                        "blocks": [
+                            {
+                                "type": "section",
+                                "text": {"type": "mrkdwn", "text": "\n".join(lines)},
+                            }
+                        ],
+                    }
+                    await client.post(
+                        inbox.forward_url,
+                        json=forward_body,
+                        headers=forward_headers,
+                    )
+                elif raw is not None:
+                    # Unmodified JSON: pass the received bytes through as-is
+                    await client.request(
+                        method=method,
+                        url=inbox.forward_url,
+                        content=raw,
+                        headers={
+                            **forward_headers,
+                            "Content-Type": content_type or "application/json",
+                        },
+                    )
+                else:
+                    await client.request(
+                        method=method,
+                        url=inbox.forward_url,
+                        json=body,
+                        headers=forward_headers,
+                    )
+            except Exception:
+                wh_logger.exception("Forwarding failed for /hooks/%s", slug)
 
-                    html_body = f"""<!DOCTYPE html>
-<html>
-<head><meta charset="utf-8"></head>
-<body style="margin:0;padding:0;background:#f4f5f7;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Helvetica,Arial,sans-serif;">
-  <table width="100%" cellpadding="0" cellspacing="0" style="background:#f4f5f7;padding:32px 0;">
-    <tr><td align="center">
-      <table width="600" cellpadding="0" cellspacing="0" style="background:#ffffff;border-radius:8px;overflow:hidden;box-shadow:0 2px 8px rgba(0,0,0,0.08);">
-        <tr>
-          <td style="background:#1a1a2e;padding:24px 32px;">
-            <h1 style="margin:0;color:#ffffff;font-size:20px;font-weight:600;">{prefix} {subject_detail}</h1>
-          </td>
-        </tr>
-        <tr>
-          <td style="padding:24px 32px;">
-            <p style="margin:0 0 16px;color:#666;font-size:14px;">A new form submission was received:</p>
-            <table width="100%" cellpadding="0" cellspacing="0" style="border:1px solid #eee;border-radius:6px;overflow:hidden;">
-              {field_rows}
-            </table>
-          </td>
-        </tr>
-        {f'<tr><td style="padding:0 32px 24px;"><a href="mailto:{sender_email}" style="display:inline-block;padding:10px 20px;background:#1a1a2e;color:#fff;text-decoration:none;border-radius:5px;font-size:14px;">Reply to {sender_name}</a></td></tr>' if sender_email_raw else ''}
-        <tr>
-          <td style="padding:16px 32px;background:#fafafa;border-top:1px solid #eee;">
-            <p style="margin:0;color:#999;font-size:12px;">Delivered by {html.escape(inbox_sender_name or 'HookForms')} &middot; <code style="background:#eee;padding:2px 6px;border-radius:3px;font-size:11px;">/hooks/{slug_escaped}</code></p>
-          </td>
-        </tr>
-      </table>
-    </td></tr>
-  </table>
-</body>
-</html>"""
+        # Nothing to show (raw text, only skipped keys or empty values): no email
+        if inbox.notify_email and displayed:
+            # Per-inbox rate limit: max 10 emails per 10 minutes
+            rate_key = f"webhook_email_rate:{inbox.id}"
+            try:
+                if await window_exceeded(rate_key, limit=10, window=600):
+                    wh_logger.warning("Email rate limit hit for inbox %s", slug)
+                    return
+            except Exception:
+                wh_logger.warning("Email rate limiter unavailable for inbox %s", slug)
+
+            try:
+                inbox_sender_name = inbox.sender_name
+                prefix, slug_escaped, footer_name = _escaped_inbox_meta(
+                    inbox.email_subject_prefix, slug, inbox_sender_name
+                )
 
-                    plain_prefix = inbox.email_subject_prefix or f"[{slug}]"
-                    plain_subject_detail = (
-                        f"from {body.get('name', 'Unknown')}" if body.get("name") else "New Submission"
+                sender_name = html.escape(str(body.get("name", "Unknown")))
+                sender_email_raw = str(body.get("email", ""))
+                sender_email = html.escape(sender_email_raw)
+                subject_detail = (
+                    f"from {sender_name}" if sender_name != "Unknown" else "New Submission"
+                )
+
+                field_rows = "".join(
+                    _EMAIL_ROW_TEMPLATE.format(
+                        label=html.escape(pretty_label(key)),
+                        value=html.escape(text),
                     )
+                    for key, text in displayed
+                )
 
-                    recipients = [e.strip() for e in inbox.notify_email.split(",") if e.strip()]
-                    loop = asyncio.get_running_loop()
-                    for recipient in recipients:
-                        await loop.run_in_executor(
-                            None,
-                            partial(
-                                send_email,
-                                to=recipient,
-                                subject=f"{plain_prefix} {plain_subject_detail}",
-                                body=html_body,
-                                html=True,
-                                sender_name=inbox_sender_name,
-                            ),
-                        )
-                except Exception as exc:
-                    wh_logger.error(
-                        "Email notification failed for /hooks/%s: %s", slug, exc, exc_info=True
+                reply_button = ""
+                if sender_email_raw:
+                    reply_button = _EMAIL_REPLY_TEMPLATE.format(
+                        email=sender_email, name=sender_name
                     )
 
-    return {"status": "received", "event_id": str(event.id)}
+                html_body = _EMAIL_TEMPLATE.format(
+                    prefix=prefix,
+                    subject_detail=subject_detail,
+                    field_rows=field_rows,
+                    reply_button=reply_button,
+                    footer_name=footer_name,
+                    slug_escaped=slug_escaped,
+                )
+
+                plain_prefix = inbox.email_subject_prefix or f"[{slug}]"
+                plain_subject_detail = (
+                    f"from {body.get('name', 'Unknown')}" if body.get("name") else "New Submission"
+                )
+
+                subject = f"{plain_prefix} {plain_subject_detail}"
+                recipients = [e.strip() for e in inbox.notify_email.split(",") if e.strip()]
+                # Send concurrently: latency follows the slowest recipient, not the sum
+                results = await asyncio.gather(
+                    *(
+                        send_email(
+                            to=recipient,
+                            subject=subject,
+                            body=html_body,
+                            html=True,
+                            sender_name=inbox_sender_name,
+                        )
+                        for recipient in recipients
+                    ),
+                    return_exceptions=True,
+                )
+                for recipient, res in zip(recipients, results):
+                    if isinstance(res, Exception):
+                        wh_logger.error(
+                            "Email notification to %s failed for /hooks/%s: %s",
+                            recipient,
+                            slug,
+                            res,
+                            exc_info=res,
+                        )
+            except Exception as exc:
+                wh_logger.error(
+                    "Email notification failed for /hooks/%s: %s", slug, exc, exc_info=True
+                )
 
 
 # ---------------------------------------------------------------------------
@@ -312,11 +550,22 @@ async def list_inboxes(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    total = (await db.execute(select(func.count()).select_from(WebhookInbox))).scalar()
+    # Page and total in one query; the window count is taken before LIMIT/OFFSET
     result = await db.execute(
-        select(WebhookInbox).order_by(WebhookInbox.created_at.desc()).limit(limit).offset(offset)
+        select(WebhookInbox, func.count().over().label("total"))
+        .order_by(WebhookInbox.created_at.desc())
+        .limit(limit)
+        .offset(offset)
     )
-    items = [WebhookInboxResponse.from_inbox(i) for i in result.scalars().all()]
+    rows = result.all()
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page: no rows to carry the window count
+        total = (await db.execute(select(func.count()).select_from(WebhookInbox))).scalar()
+    else:
+        total = 0
+    items = [WebhookInboxResponse.from_inbox(row.WebhookInbox) for row in rows]
     return paginated_response(items, total, limit, offset)
 
 
@@ -327,14 +576,18 @@ async def create_inbox(
     _key=Depends(require_scope("webhooks")),
 ):
     if body.forward_url:
-        safe, reason = is_safe_url(body.forward_url)
+        safe, reason = await is_safe_url(body.forward_url)
         if not safe:
             raise HTTPException(status_code=400, detail=f"Invalid forward_url: {reason}")
 
-    inbox = WebhookInbox(**body.model_dump())
-    db.add(inbox)
+    # RETURNING brings back the server-defaulted timestamps without a refresh
+    result = await db.execute(
+        insert(WebhookInbox)
+        .values(**body.model_dump(), forward_kind=_forward_kind(body.forward_url))
+        .returning(WebhookInbox)
+    )
+    inbox = result.scalar_one()
     await db.commit()
-    await db.refresh(inbox)
     return single_response(WebhookInboxResponse.from_inbox(inbox))
 
 
@@ -345,23 +598,31 @@ async def update_inbox(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    result = await db.execute(select(WebhookInbox).where(WebhookInbox.slug == slug))
-    inbox = result.scalar_one_or_none()
-    if not inbox:
-        raise HTTPException(status_code=404, detail="Inbox not found")
-
     update_data = body.model_dump(exclude_unset=True)
     if "forward_url" in update_data and update_data["forward_url"]:
-        safe, reason = is_safe_url(update_data["forward_url"])
+        safe, reason = await is_safe_url(update_data["forward_url"])
         if not safe:
             raise HTTPException(status_code=400, detail=f"Invalid forward_url: {reason}")
+    if "forward_url" in update_data:
+        update_data["forward_kind"] = _forward_kind(update_data["forward_url"])
 
     if update_data:
-        await db.execute(
-            update(WebhookInbox).where(WebhookInbox.slug == slug).values(**update_data)
+        # One round trip: the updated row comes back via RETURNING
+        stmt = (
+            update(WebhookInbox)
+            .where(WebhookInbox.slug == slug)
+            .values(**update_data)
+            .returning(WebhookInbox)
         )
-        await db.commit()
-        await db.refresh(inbox)
+    else:
+        stmt = select(WebhookInbox).where(WebhookInbox.slug == slug)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    inbox = result.scalar_one_or_none()
+    if not inbox:
+        raise HTTPException(status_code=404, detail="Inbox not found")
+    await db.commit()
+    if update_data:
+        await invalidate_inbox(slug)
 
     return single_response(WebhookInboxResponse.from_inbox(inbox))
 
@@ -372,12 +633,15 @@ async def delete_inbox(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    result = await db.execute(select(WebhookInbox).where(WebhookInbox.slug == slug))
-    inbox = result.scalar_one_or_none()
-    if not inbox:
+    # Events, channels and providers go with it via ON DELETE CASCADE, so the
+    # ORM never loads them
+    result = await db.execute(
+        delete(WebhookInbox).where(WebhookInbox.slug == slug).returning(WebhookInbox.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Inbox not found")
-    await db.delete(inbox)
     await db.commit()
+    await invalidate_inbox(slug)
 
 
 @router.get("/{slug}/events", summary="List webhook events")
@@ -385,29 +649,72 @@ async def list_events(
     slug: str,
     limit: int = Query(50, le=200),
     offset: int = Query(0),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "meta.next_cursor of the previous page; replaces offset. "
+            "Cursor pages return meta.total as null."
+        ),
+    ),
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    result = await db.execute(select(WebhookInbox).where(WebhookInbox.slug == slug))
-    inbox = result.scalar_one_or_none()
-    if not inbox:
+    # id only: answered index-only from the covering slug index
+    result = await db.execute(select(WebhookInbox.id).where(WebhookInbox.slug == slug))
+    inbox_id = result.scalar_one_or_none()
+    if not inbox_id:
         raise HTTPException(status_code=404, detail="Inbox not found")
 
-    total = (
-        await db.execute(
-            select(func.count()).select_from(WebhookEvent).where(WebhookEvent.inbox_id == inbox.id)
+    filters = [WebhookEvent.inbox_id == inbox_id]
+    newest_first = (WebhookEvent.received_at.desc(), WebhookEvent.id.desc())
+
+    if cursor is not None:
+        # Keyset page: seek past the last row seen instead of skipping rows.
+        # No total here: counting every match would make each page as costly
+        # as the OFFSET scan this replaces. One extra row tells if more follow.
+        result = await db.execute(
+            select(WebhookEvent)
+            .where(
+                *filters,
+                tuple_(WebhookEvent.received_at, WebhookEvent.id)
+                < _decode_event_cursor(cursor),
+            )
+            .order_by(*newest_first)
+            .limit(limit + 1)
+        )
+        events = list(result.scalars())
+        has_more = len(events) > limit
+        events = events[:limit]
+        total = None
+        offset = 0
+    else:
+        # Page and total in one query; the window count is taken before LIMIT/OFFSET
+        result = await db.execute(
+            select(WebhookEvent, func.count().over().label("total"))
+            .where(*filters)
+            .order_by(*newest_first)
+            .limit(limit)
+            .offset(offset)
         )
-    ).scalar()
+        rows = result.all()
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Past the last page: no rows to carry the window count
+            total = (
+                await db.execute(select(func.count()).select_from(WebhookEvent).where(*filters))
+            ).scalar()
+        else:
+            total = 0
+        events = [row.WebhookEvent for row in rows]
+        has_more = total > offset + len(events)
 
-    events = await db.execute(
-        select(WebhookEvent)
-        .where(WebhookEvent.inbox_id == inbox.id)
-        .order_by(WebhookEvent.received_at.desc())
-        .limit(limit)
-        .offset(offset)
-    )
-    items = [WebhookEventResponse.model_validate(e) for e in events.scalars().all()]
-    return paginated_response(items, total, limit, offset)
+    items = [WebhookEventResponse.from_event(event) for event in events]
+    next_cursor = None
+    if events and has_more:
+        last = events[-1]
+        next_cursor = _encode_event_cursor(last.received_at, last.id)
+    return paginated_response(items, total, limit, offset, next_cursor=next_cursor)
 
 
 @router.get("/{slug}/events/{event_id}", summary="Get a single webhook event")
@@ -417,19 +724,19 @@ async def get_event(
     db: AsyncSession = Depends(get_db),
     _key=Depends(require_scope("webhooks")),
 ):
-    result = await db.execute(select(WebhookInbox).where(WebhookInbox.slug == slug))
-    inbox = result.scalar_one_or_none()
-    if not inbox:
+    result = await db.execute(select(WebhookInbox.id).where(WebhookInbox.slug == slug))
+    inbox_id = result.scalar_one_or_none()
+    if not inbox_id:
         raise HTTPException(status_code=404, detail="Inbox not found")
 
     event = await db.execute(
         select(WebhookEvent).where(
             WebhookEvent.id == event_id,
-            WebhookEvent.inbox_id == inbox.id,
+            WebhookEvent.inbox_id == inbox_id,
         )
     )
     evt = event.scalar_one_or_none()
     if not evt:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    return single_response(WebhookEventResponse.model_validate(evt))
+    return single_response(WebhookEventResponse.from_event(evt))
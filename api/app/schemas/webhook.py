@@ -18,7 +18,9 @@ class WebhookInboxCreate(BaseModel):
     )
     sender_name: Optional[str] = Field(
         None,
-        description="Display name for the email sender (e.g. 'Acme Corp'). Defaults to 'HookForms'.",
+        description=(
+            "Display name for the email sender (e.g. 'Acme Corp'). Defaults to 'HookForms'."
+        ),
     )
     turnstile_secret: Optional[str] = Field(
         None, description="Cloudflare Turnstile secret for bot protection"
@@ -51,9 +53,19 @@ class WebhookInboxResponse(BaseModel):
 
     @classmethod
     def from_inbox(cls, inbox) -> "WebhookInboxResponse":
-        resp = cls.model_validate(inbox)
-        resp.has_turnstile = bool(inbox.turnstile_secret)
-        return resp
+        # Rows come from the database already typed; skip validation
+        return cls.model_construct(
+            id=inbox.id,
+            slug=inbox.slug,
+            description=inbox.description,
+            forward_url=inbox.forward_url,
+            notify_email=inbox.notify_email,
+            email_subject_prefix=inbox.email_subject_prefix,
+            sender_name=inbox.sender_name,
+            has_turnstile=bool(inbox.turnstile_secret),
+            is_active=inbox.is_active,
+            created_at=inbox.created_at,
+        )
 
 
 class WebhookEventResponse(BaseModel):
@@ -66,3 +78,16 @@ class WebhookEventResponse(BaseModel):
     received_at: datetime
 
     model_config = {"from_attributes": True}
+
+    @classmethod
+    def from_event(cls, event) -> "WebhookEventResponse":
+        # Rows come from the database already typed; skip validation
+        return cls.model_construct(
+            id=event.id,
+            method=event.method,
+            headers=event.headers,
+            body=event.body,
+            query_params=event.query_params,
+            source_ip=event.source_ip,
+            received_at=event.received_at,
+        )
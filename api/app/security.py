@@ -1,11 +1,17 @@
 """SSRF protection for webhook forwarding."""
 
+import asyncio
 import ipaddress
 import logging
 import socket
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Optional
 from urllib.parse import urlparse
 
+import httpcore
 import httpx
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +27,17 @@ _BLOCKED_NETWORKS = [
     ipaddress.ip_network("fe80::/10"),
 ]
 
+# Per IP version: (first, last) address integers of each blocked network, sorted
+# so a lookup is one bisect. The networks don't overlap, so only the last range
+# starting at or below the address can contain it.
+_BLOCKED_RANGES: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+for _network in _BLOCKED_NETWORKS:
+    _BLOCKED_RANGES[_network.version].append(
+        (int(_network.network_address), int(_network.broadcast_address))
+    )
+for _ranges in _BLOCKED_RANGES.values():
+    _ranges.sort()
+
 _BLOCKED_HOSTNAMES = {
     "localhost",
     "postgres",
@@ -37,12 +54,51 @@ _BLOCKED_HOSTNAMES = {
 def _is_ip_blocked(ip_str: str) -> bool:
     try:
         ip = ipaddress.ip_address(ip_str)
-        return any(ip in network for network in _BLOCKED_NETWORKS)
     except ValueError:
         return True
-
-
-def is_safe_url(url: str) -> tuple[bool, str]:
+    ranges = _BLOCKED_RANGES[ip.version]
+    ip_int = int(ip)
+    # Last range starting at or below the address
+    idx = bisect_right(ranges, ip_int, key=itemgetter(0)) - 1
+    return idx >= 0 and ip_int <= ranges[idx][1]
+
+
+# Per-hostname DNS answers: (True if any address is blocked, all addresses in
+# resolver order). Lookups that fail are not cached.
+_DNS_CACHE_TTL = 300
+_dns_answers: TTLCache = TTLCache(maxsize=4096, ttl=_DNS_CACHE_TTL)
+
+
+async def _resolve(hostname: str) -> Optional[tuple[bool, tuple[str, ...]]]:
+    """Resolve hostname to (blocked, addresses); None if it doesn't resolve.
+
+    Resolution goes through the loop's resolver (a worker thread), so a slow
+    DNS answer never blocks the event loop.
+    """
+    key = hostname.lower()
+    answer = _dns_answers.get(key)
+    if answer is None:
+        try:
+            addr_infos = await asyncio.get_running_loop().getaddrinfo(
+                hostname, None, family=socket.AF_UNSPEC, type=socket.SOCK_STREAM
+            )
+        except socket.gaierror:
+            return None
+        addresses = tuple(dict.fromkeys(sockaddr[0] for *_, sockaddr in addr_infos))
+        if not addresses:
+            return None
+        answer = (any(_is_ip_blocked(address) for address in addresses), addresses)
+        _dns_answers[key] = answer
+    return answer
+
+
+async def _resolves_to_blocked_ip(hostname: str) -> Optional[bool]:
+    """Whether hostname resolves to a private/reserved IP; None if it doesn't resolve."""
+    answer = await _resolve(hostname)
+    return None if answer is None else answer[0]
+
+
+async def is_safe_url(url: str) -> tuple[bool, str]:
     try:
         parsed = urlparse(url)
     except Exception:
@@ -58,44 +114,119 @@ def is_safe_url(url: str) -> tuple[bool, str]:
     if hostname.lower() in _BLOCKED_HOSTNAMES:
         return False, f"Hostname '{hostname}' is not allowed"
 
-    try:
-        addr_infos = socket.getaddrinfo(hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
-        for family, _, _, _, sockaddr in addr_infos:
-            if _is_ip_blocked(sockaddr[0]):
-                return False, "URL resolves to private/reserved IP address"
-    except socket.gaierror:
+    blocked = await _resolves_to_blocked_ip(hostname)
+    if blocked is None:
         return False, "Cannot resolve hostname"
+    if blocked:
+        return False, "URL resolves to private/reserved IP address"
 
     return True, ""
 
 
-class SSRFSafeTransport(httpx.AsyncHTTPTransport):
-    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
-        hostname = request.url.host
-        if hostname:
-            if hostname.lower() in _BLOCKED_HOSTNAMES:
-                raise httpx.ConnectError(f"Blocked hostname: {hostname}")
+class _SSRFSafeBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that checks a hostname's addresses and connects to them.
+
+    The connection goes to the addresses that were just checked, so the name
+    is resolved once and its answer can't change between check and connect.
+    The pool still keys connections by hostname, and TLS (SNI and certificate
+    verification) still runs against the hostname.
+    """
+
+    def __init__(self) -> None:
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        if host.lower() in _BLOCKED_HOSTNAMES:
+            raise httpcore.ConnectError(f"Blocked hostname: {host}")
+        answer = await _resolve(host)
+        if answer is None:
+            raise httpcore.ConnectError(f"Cannot resolve hostname: {host}")
+        blocked, addresses = answer
+        if blocked:
+            raise httpcore.ConnectError(f"DNS resolved to blocked IP for {host}")
+
+        # Try each address in resolver order, like a plain connect would
+        error: Optional[Exception] = None
+        for address in addresses:
             try:
-                addr_infos = socket.getaddrinfo(
-                    hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
                 )
-                for family, _, _, _, sockaddr in addr_infos:
-                    if _is_ip_blocked(sockaddr[0]):
-                        raise httpx.ConnectError(f"DNS resolved to blocked IP for {hostname}")
-            except socket.gaierror:
-                raise httpx.ConnectError(f"Cannot resolve hostname: {hostname}")
-        return await super().handle_async_request(request)
+            except httpcore.ConnectError as exc:
+                error = exc
+        raise error
+
+    async def connect_unix_socket(self, path: str, timeout=None, socket_options=None):
+        raise httpcore.ConnectError("Unix socket connections are not allowed")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class SSRFSafeTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, http2: bool = False, limits: httpx.Limits = httpx.Limits()):
+        super().__init__(http2=http2, limits=limits)
+        # httpx takes no network backend argument, so the pool it built is
+        # replaced with an equivalent one that connects through the SSRF check
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=_SSRFSafeBackend(),
+        )
 
 
 def safe_http_client(
     timeout: float = 15,
     follow_redirects: bool = True,
+    http2: bool = False,
+    limits: httpx.Limits = httpx.Limits(),
     **kwargs,
 ) -> httpx.AsyncClient:
-    transport = SSRFSafeTransport()
+    # Pool options must go on the transport; the client ignores them when one is given
+    transport = SSRFSafeTransport(http2=http2, limits=limits)
     return httpx.AsyncClient(
         timeout=timeout,
         follow_redirects=follow_redirects,
         transport=transport,
         **kwargs,
     )
+
+
+# Process-wide client so notification fanout reuses pooled connections and
+# TLS sessions instead of paying a handshake per request. HTTP/2 lets several
+# channels on the same host (e.g. multiple Discord webhooks) share one connection.
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def get_safe_client() -> httpx.AsyncClient:
+    """Return the shared SSRF-safe client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = safe_http_client(
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        )
+    return _shared_client
+
+
+async def close_safe_client() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
@@ -1,31 +1,175 @@
-"""ARQ background worker — event cleanup cron."""
+"""ARQ background worker — event cleanup, partition upkeep and queue drain crons."""
 
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Optional
 from urllib.parse import urlparse
 
 from arq import cron
 from arq.connections import RedisSettings
 from sqlalchemy import delete as sa_delete
+from sqlalchemy import select, text
 
 from app.config import settings
 from app.database import async_session
+from app.event_queue import BATCH_SIZE, flush_events, requeue_orphaned_events
 from app.models.webhook import WebhookEvent
 
 logger = logging.getLogger(__name__)
 
 
-async def cleanup_old_webhook_events(ctx: dict[str, Any]) -> None:
-    """Delete webhook events older than the configured retention period."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.event_retention_days)
+CLEANUP_BATCH_SIZE = 10_000
+
+# webhook_events is range-partitioned by month on received_at (migration 0015)
+PARTITION_PREFIX = "webhook_events_"
+PARTITION_MONTHS_AHEAD = 2
+DEFAULT_PARTITION = "webhook_events_default"
+
+
+def _month_start(dt: datetime, months: int = 0) -> datetime:
+    """First instant (UTC) of the month ``months`` after the one containing ``dt``."""
+    index = dt.year * 12 + dt.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _partition_month(name: str) -> Optional[datetime]:
+    """Parse the month out of a webhook_events_YYYY_MM partition name."""
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y_%m").replace(
+            tzinfo=timezone.utc
+        )
+    except ValueError:
+        return None  # e.g. the default partition
+
+
+async def _create_partition(db, name: str, start: datetime, end: datetime) -> None:
+    exists = await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if exists.scalar():
+        return
+    bounds = {"start": start, "end": end}
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF webhook_events "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    in_range = "received_at >= :start AND received_at < :end"
+    stray = await db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds
+    )
+    if not stray.scalar():
+        await db.execute(create)
+        return
+
+    # Postgres refuses a new partition while the default partition holds rows
+    # in its range (e.g. after missed runs): move them over while detached
+    await db.execute(text(f"ALTER TABLE webhook_events DETACH PARTITION {DEFAULT_PARTITION}"))
+    await db.execute(create)
+    moved = await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await db.execute(
+        text(f"ALTER TABLE webhook_events ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    )
+    logger.info("Moved %d webhook events from the default partition to %s", moved.rowcount, name)
+
+
+async def ensure_event_partitions(ctx: dict[str, Any]) -> None:
+    """Create the monthly webhook_events partitions for the coming months.
+
+    Rows outside every monthly partition land in the default partition, so a
+    missed run costs partition pruning, not inserts; the next run moves them.
+    Each month is created in its own transaction, so one failure doesn't stop
+    the others.
+    """
+    now = datetime.now(timezone.utc)
+    for months in range(PARTITION_MONTHS_AHEAD + 1):
+        start = _month_start(now, months)
+        name = f"{PARTITION_PREFIX}{start:%Y_%m}"
+        try:
+            async with async_session() as db:
+                await _create_partition(db, name, start, _month_start(now, months + 1))
+                await db.commit()
+        except Exception:
+            logger.exception("Could not create webhook event partition %s", name)
+
+
+async def _drop_expired_partitions(cutoff: datetime) -> int:
+    """Drop monthly partitions that lie entirely before the cutoff."""
     async with async_session() as db:
         result = await db.execute(
-            sa_delete(WebhookEvent).where(WebhookEvent.received_at < cutoff)
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'webhook_events'::regclass"
+            )
         )
-        if result.rowcount:
-            logger.info("Cleaned up %d old webhook events", result.rowcount)
+        expired = []
+        for name in result.scalars():
+            month = _partition_month(name)
+            if month is not None and _month_start(month, 1) <= cutoff:
+                expired.append(name)
+        for name in expired:
+            await db.execute(text(f'DROP TABLE "{name}"'))
         await db.commit()
+    return len(expired)
+
+
+async def cleanup_old_webhook_events(ctx: dict[str, Any]) -> None:
+    """Delete webhook events older than the configured retention period.
+
+    Whole expired months are dropped as partitions; the rest (the month that
+    straddles the cutoff and the default partition) is deleted in batches,
+    committing each, so no single transaction holds a huge number of row locks
+    or writes one giant burst of WAL.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.event_retention_days)
+    dropped = await _drop_expired_partitions(cutoff)
+    if dropped:
+        logger.info("Dropped %d expired webhook event partitions", dropped)
+
+    expired = (
+        select(WebhookEvent.id)
+        .where(WebhookEvent.received_at < cutoff)
+        .limit(CLEANUP_BATCH_SIZE)
+        .scalar_subquery()
+    )
+    total = 0
+    while True:
+        async with async_session() as db:
+            result = await db.execute(
+                sa_delete(WebhookEvent)
+                .where(WebhookEvent.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        total += result.rowcount
+        if result.rowcount < CLEANUP_BATCH_SIZE:
+            break
+    if total:
+        logger.info("Cleaned up %d old webhook events", total)
+
+
+async def drain_webhook_events(ctx: dict[str, Any]) -> None:
+    """Write out queued webhook events.
+
+    The API processes drain the queue continuously; this catches anything left
+    behind while none of them is running (e.g. during a deploy), and returns
+    events claimed by API processes that died mid-flush to the queue.
+    """
+    requeued = await requeue_orphaned_events()
+    if requeued:
+        logger.warning("Requeued %d webhook events from dead flushers", requeued)
+    total = 0
+    while True:
+        written = await flush_events()
+        total += written
+        if written < BATCH_SIZE:
+            break
+    if total:
+        logger.info("Drained %d queued webhook events", total)
 
 
 def parse_redis_url(url: str) -> RedisSettings:
@@ -42,5 +186,7 @@ class WorkerSettings:
     functions = []
     cron_jobs = [
         cron(cleanup_old_webhook_events, hour={3}, minute={0}),
+        cron(ensure_event_partitions, hour={2}, minute={30}),
+        cron(drain_webhook_events),  # every minute
     ]
     redis_settings = parse_redis_url(settings.redis_url)
@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+# app.config refuses to load without an admin key; set test values before any
+# app module is imported
+os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+os.environ.setdefault("API_KEY_PEPPER", "test-pepper")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
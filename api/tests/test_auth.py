@@ -0,0 +1,182 @@
+import uuid
+
+import pytest
+from app import auth
+from app.auth import get_current_key, hash_key, require_scope, scope_bits
+from app.models.api_key import ApiKey
+from fastapi import HTTPException
+from passlib.hash import pbkdf2_sha256
+from starlette.requests import Request
+
+RAW_KEY = "hf_" + "k" * 43
+
+
+class FakeResult:
+    def __init__(self, value=None):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Answers execute() calls with the given results, in order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else None)
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeRedis:
+    def __init__(self, failures=0):
+        self.counters = {}
+        if failures:
+            self.counters["auth_fail:1.2.3.4"] = failures
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        value = self.counters.get(key)
+        return None if value is None else str(value)
+
+    async def delete(self, key):
+        self.calls.append(("delete", key))
+        self.counters.pop(key, None)
+
+    async def incr_window(self, keys, args):
+        self.calls.append(("incr_window", keys[0]))
+        self.counters[keys[0]] = self.counters.get(keys[0], 0) + 1
+        return self.counters[keys[0]]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(auth, "redis_client", fake)
+    monkeypatch.setattr(auth, "incr_window", fake.incr_window)
+    auth._key_cache.clear()
+    yield fake
+    auth._key_cache.clear()
+
+
+def _request() -> Request:
+    return Request({"type": "http", "headers": [], "client": ("1.2.3.4", 5555)})
+
+
+def _db_key(**kwargs) -> ApiKey:
+    fields = {
+        "id": uuid.uuid4(),
+        "name": "ci",
+        "scopes": ["webhooks"],
+        "scopes_bits": scope_bits(["webhooks"]),
+        "is_active": True,
+    }
+    fields.update(kwargs)
+    return ApiKey(**fields)
+
+
+@pytest.mark.anyio
+async def test_keyed_hash_match_costs_one_redis_call(redis):
+    key = _db_key(key_sha256=hash_key(RAW_KEY))
+    db = FakeSession(key)
+
+    assert await get_current_key(_request(), RAW_KEY, db) is key
+    assert redis.calls == [("get", "auth_fail:1.2.3.4")]
+    assert len(db.statements) == 1
+
+
+@pytest.mark.anyio
+async def test_verified_key_is_cached(redis):
+    key = _db_key(key_sha256=hash_key(RAW_KEY))
+    await get_current_key(_request(), RAW_KEY, FakeSession(key))
+    redis.calls.clear()
+
+    db = FakeSession()
+    assert await get_current_key(_request(), RAW_KEY, db) is key
+    assert redis.calls == []
+    assert db.statements == []
+
+
+@pytest.mark.anyio
+async def test_success_clears_recorded_failures(redis):
+    redis.counters["auth_fail:1.2.3.4"] = 3
+    key = _db_key(key_sha256=hash_key(RAW_KEY))
+
+    await get_current_key(_request(), RAW_KEY, FakeSession(key))
+
+    assert ("delete", "auth_fail:1.2.3.4") in redis.calls
+    assert "auth_fail:1.2.3.4" not in redis.counters
+
+
+@pytest.mark.anyio
+async def test_legacy_key_is_accepted_and_backfilled(redis):
+    key = _db_key(key_prefix=RAW_KEY[:12], key_hash=pbkdf2_sha256.hash(RAW_KEY))
+    # keyed-hash lookup misses, legacy prefix lookup hits, then the backfill UPDATE
+    db = FakeSession(None, key, None)
+
+    assert await get_current_key(_request(), RAW_KEY, db) is key
+
+    backfill = db.statements[2].compile()
+    assert backfill.params["key_sha256"] == hash_key(RAW_KEY)
+    assert "last_used_at" in backfill.params
+    assert db.commits == 1
+
+
+@pytest.mark.anyio
+async def test_legacy_key_with_wrong_secret_is_rejected(redis):
+    key = _db_key(key_prefix=RAW_KEY[:12], key_hash=pbkdf2_sha256.hash("hf_other"))
+    db = FakeSession(None, key)
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_key(_request(), RAW_KEY, db)
+
+    assert exc.value.status_code == 401
+    assert db.commits == 0
+    assert redis.counters["auth_fail:1.2.3.4"] == 1
+
+
+@pytest.mark.anyio
+async def test_unknown_key_records_a_failure(redis):
+    with pytest.raises(HTTPException) as exc:
+        await get_current_key(_request(), RAW_KEY, FakeSession())
+
+    assert exc.value.status_code == 401
+    assert redis.calls == [("get", "auth_fail:1.2.3.4"), ("incr_window", "auth_fail:1.2.3.4")]
+
+
+@pytest.mark.anyio
+async def test_locked_out_ip_is_refused_before_lookup(redis):
+    redis.counters["auth_fail:1.2.3.4"] = auth._LOCKOUT_THRESHOLD
+    db = FakeSession()
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_key(_request(), RAW_KEY, db)
+
+    assert exc.value.status_code == 429
+    assert db.statements == []
+
+
+@pytest.mark.anyio
+async def test_admin_key(redis):
+    key = await get_current_key(_request(), "test-admin-key", FakeSession())
+
+    assert key.scopes_bits == auth.ALL_SCOPE_BITS
+    assert redis.calls == [("get", "auth_fail:1.2.3.4")]
+
+
+@pytest.mark.anyio
+async def test_require_scope_checks_bits(redis):
+    webhooks_key = _db_key()
+
+    assert await require_scope("webhooks")(webhooks_key) is webhooks_key
+    with pytest.raises(HTTPException) as exc:
+        await require_scope("admin")(webhooks_key)
+    assert exc.value.status_code == 403
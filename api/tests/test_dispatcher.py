@@ -0,0 +1,83 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from app.channels import dispatcher
+
+INBOX = SimpleNamespace(
+    id=uuid.uuid4(), slug="contact", email_subject_prefix=None, sender_name=None
+)
+BODY = {"name": "Ada", "message": "Hello"}
+
+
+def _channel(channel_type: str, **config):
+    return SimpleNamespace(id=uuid.uuid4(), type=channel_type, config=config, is_active=True)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    payloads = []
+
+    async def send(client, payload, channel_id):
+        payloads.append(payload)
+
+    monkeypatch.setattr(dispatcher, "_send_notification", send)
+    monkeypatch.setattr(dispatcher, "get_safe_client", lambda: None)
+    return payloads
+
+
+@pytest.fixture
+def formatted(monkeypatch):
+    """Counts formatter calls per channel type."""
+    counts: dict[str, int] = {}
+    for channel_type, formatter in list(dispatcher._FORMATTERS.items()):
+
+        def counting(config, ctx, channel_type=channel_type, formatter=formatter):
+            counts[channel_type] = counts.get(channel_type, 0) + 1
+            return formatter(config, ctx)
+
+        monkeypatch.setitem(dispatcher._FORMATTERS, channel_type, counting)
+    return counts
+
+
+@pytest.mark.anyio
+async def test_channels_differing_only_in_url_share_one_payload(sent, formatted):
+    channels = [
+        _channel("discord", webhook_url="https://discord.com/api/webhooks/1/a"),
+        _channel("discord", webhook_url="https://discord.com/api/webhooks/2/b"),
+        _channel("ntfy", url="https://ntfy.sh/one"),
+        _channel("ntfy", url="https://ntfy.sh/two"),
+    ]
+
+    await dispatcher.dispatch_notifications(INBOX, channels, BODY)
+
+    assert formatted == {"discord": 1, "ntfy": 1}
+    assert [payload.url for payload in sent] == [
+        channel.config.get("webhook_url") or channel.config["url"] for channel in channels
+    ]
+    assert sent[0].body == sent[1].body
+    assert sent[2].body == sent[3].body
+
+
+@pytest.mark.anyio
+async def test_other_config_differences_are_formatted_separately(sent, formatted):
+    channels = [
+        _channel("webhook", url="https://example.com/a", custom_headers={"X-Team": "a"}),
+        _channel("webhook", url="https://example.com/b", custom_headers={"X-Team": "b"}),
+    ]
+
+    await dispatcher.dispatch_notifications(INBOX, channels, BODY)
+
+    assert formatted == {"webhook": 2}
+    assert [payload.headers.get("X-Team") for payload in sent] == ["a", "b"]
+
+
+@pytest.mark.anyio
+async def test_cache_lives_for_one_dispatch(sent, formatted):
+    channel = _channel("slack", webhook_url="https://hooks.slack.com/services/T/B/x")
+
+    await dispatcher.dispatch_notifications(INBOX, [channel], BODY)
+    await dispatcher.dispatch_notifications(INBOX, [channel], {"name": "Grace"})
+
+    assert formatted == {"slack": 2}
+    assert sent[0].body != sent[1].body
@@ -0,0 +1,237 @@
+import uuid
+from datetime import UTC, datetime
+
+import orjson
+import pytest
+from app import event_queue
+from app.event_queue import DEAD_LETTER_KEY, EVENT_QUEUE_KEY, PROCESSING_KEY_PREFIX
+
+
+class FakeRedis:
+    """In-memory lists and keys, with _claim and _requeue done in Python."""
+
+    def __init__(self):
+        self.lists: dict[str, list[str]] = {}
+        self.keys: dict[str, object] = {}
+
+    # Queue producers LPUSH, so the consuming end is the right
+    def queue(self, *items: str) -> None:
+        self.lists.setdefault(EVENT_QUEUE_KEY, [])[:0] = reversed(items)
+
+    async def set(self, key, value, ex=None):
+        self.keys[key] = value
+
+    async def exists(self, key):
+        return int(key in self.keys)
+
+    async def delete(self, key):
+        self.lists.pop(key, None)
+        self.keys.pop(key, None)
+
+    async def blmove(self, src_key, dest_key, timeout, src, dest):
+        src_list = self.lists.get(src_key)
+        if not src_list:
+            return None
+        item = src_list.pop()
+        self.lists.setdefault(dest_key, []).append(item)
+        return item
+
+    async def scan_iter(self, match):
+        for key in list(self.lists):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def claim(self, keys, args):
+        queue = self.lists.setdefault(keys[0], [])
+        processing = self.lists.setdefault(keys[1], [])
+        while queue and len(processing) < args[0]:
+            processing.append(queue.pop())
+        return list(processing)
+
+    async def requeue(self, keys, args=()):
+        items = self.lists.pop(keys[0], [])
+        self.lists.setdefault(keys[1], []).extend(reversed(items))
+        return len(items)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def rpush(self, key, *items):
+        self.ops.append(lambda: self.redis.lists.setdefault(key, []).extend(items))
+
+    def ltrim(self, key, start, end):
+        def trim():
+            self.redis.lists[key] = self.redis.lists[key][start:]
+
+        self.ops.append(trim)
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+class DataError(Exception):
+    """Stands in for a DBAPI error wrapped by SQLAlchemy."""
+
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.orig = type("Orig", (), {"sqlstate": sqlstate})()
+
+
+class FakeDatabase:
+    def __init__(self, reject=(), fail=None):
+        self.reject = set(reject)
+        self.fail = fail
+        self.rows = []
+        self.copies = 0
+
+    async def insert_rows(self, rows):
+        if self.fail:
+            raise self.fail
+        if any(row["id"] in self.reject for row in rows):
+            raise DataError("23503")
+        self.rows.extend(rows)
+
+    async def copy_rows(self, rows):
+        self.copies += 1
+        await self.insert_rows(rows)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(event_queue, "redis_client", fake)
+    monkeypatch.setattr(event_queue, "_claim", fake.claim)
+    monkeypatch.setattr(event_queue, "_requeue", fake.requeue)
+    monkeypatch.setattr(event_queue, "_heartbeat_at", 0.0)
+    return fake
+
+
+def _use_db(monkeypatch, db: FakeDatabase) -> FakeDatabase:
+    monkeypatch.setattr(event_queue, "_insert_rows", db.insert_rows)
+    monkeypatch.setattr(event_queue, "_copy_rows", db.copy_rows)
+    return db
+
+
+def _event() -> tuple[uuid.UUID, str]:
+    event_id = event_queue.new_event_id()
+    row = {
+        "id": event_id,
+        "inbox_id": uuid.uuid4(),
+        "method": "POST",
+        "headers": {},
+        "body": {"name": "Ada"},
+        "query_params": {},
+        "source_ip": "203.0.113.7",
+        "received_at": datetime.now(UTC),
+    }
+    return event_id, orjson.dumps(row, default=str).decode()
+
+
+def test_new_event_id_is_uuid7():
+    first, second = event_queue.new_event_id(), event_queue.new_event_id()
+    assert first.version == 7
+    assert first.variant == uuid.RFC_4122
+    assert first.int >> 80 <= second.int >> 80
+
+
+@pytest.mark.anyio
+async def test_flush_writes_batch_and_clears_processing_list(redis, monkeypatch):
+    db = _use_db(monkeypatch, FakeDatabase())
+    events = [_event() for _ in range(3)]
+    redis.queue(*(item for _, item in events))
+
+    assert await event_queue.flush_events(block=1) == 3
+
+    assert [row["id"] for row in db.rows] == [event_id for event_id, _ in events]
+    assert not redis.lists.get(EVENT_QUEUE_KEY)
+    assert event_queue._PROCESSING_KEY not in redis.lists
+
+
+@pytest.mark.anyio
+async def test_large_batch_goes_through_copy(redis, monkeypatch):
+    db = _use_db(monkeypatch, FakeDatabase())
+    redis.queue(*(_event()[1] for _ in range(event_queue.COPY_THRESHOLD)))
+
+    await event_queue.flush_events()
+
+    assert db.copies == 1
+    assert len(db.rows) == event_queue.COPY_THRESHOLD
+
+
+@pytest.mark.anyio
+async def test_empty_queue(redis, monkeypatch):
+    _use_db(monkeypatch, FakeDatabase())
+    assert await event_queue.flush_events(block=1) == 0
+    assert await event_queue.flush_events() == 0
+
+
+@pytest.mark.anyio
+async def test_poison_row_is_dead_lettered_and_the_rest_written(redis, monkeypatch):
+    events = [_event() for _ in range(3)]
+    poison_id, poison_item = events[1]
+    db = _use_db(monkeypatch, FakeDatabase(reject={poison_id}))
+    redis.queue(*(item for _, item in events))
+
+    assert await event_queue.flush_events() == 3
+
+    assert [row["id"] for row in db.rows] == [events[0][0], events[2][0]]
+    assert redis.lists[DEAD_LETTER_KEY] == [poison_item]
+    assert event_queue._PROCESSING_KEY not in redis.lists
+
+
+@pytest.mark.anyio
+async def test_undecodable_item_is_dead_lettered(redis, monkeypatch):
+    db = _use_db(monkeypatch, FakeDatabase())
+    event_id, item = _event()
+    redis.queue("not json", item)
+
+    await event_queue.flush_events()
+
+    assert [row["id"] for row in db.rows] == [event_id]
+    assert redis.lists[DEAD_LETTER_KEY] == ["not json"]
+
+
+@pytest.mark.anyio
+async def test_transient_failure_requeues_batch_in_order(redis, monkeypatch):
+    _use_db(monkeypatch, FakeDatabase(fail=ConnectionError("database is down")))
+    items = [_event()[1] for _ in range(3)]
+    redis.queue(*items)
+    before = list(redis.lists[EVENT_QUEUE_KEY])
+
+    with pytest.raises(ConnectionError):
+        await event_queue.flush_events(block=1)
+
+    assert redis.lists[EVENT_QUEUE_KEY] == before
+    assert event_queue._PROCESSING_KEY not in redis.lists
+    assert DEAD_LETTER_KEY not in redis.lists
+
+
+@pytest.mark.anyio
+async def test_orphaned_processing_lists_are_requeued(redis):
+    orphan = f"{PROCESSING_KEY_PREFIX}dead-flusher"
+    alive = f"{PROCESSING_KEY_PREFIX}live-flusher"
+    redis.lists[orphan] = ["a", "b"]
+    redis.lists[alive] = ["c"]
+    redis.lists[event_queue._PROCESSING_KEY] = ["d"]
+    redis.keys[f"{event_queue.FLUSHER_KEY_PREFIX}live-flusher"] = 1
+
+    assert await event_queue.requeue_orphaned_events() == 2
+
+    # Back at the consuming end, "a" first
+    assert redis.lists[EVENT_QUEUE_KEY] == ["b", "a"]
+    assert orphan not in redis.lists
+    assert redis.lists[alive] == ["c"]
+    assert redis.lists[event_queue._PROCESSING_KEY] == ["d"]
@@ -0,0 +1,118 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from app.models.webhook import WebhookEvent
+from app.routers.webhooks import _decode_event_cursor, _encode_event_cursor, list_events
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+INBOX_ID = uuid.uuid4()
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return iter(self.rows)
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Returns the inbox id for the first query and the given rows for the next."""
+
+    def __init__(self, rows):
+        self.results = [FakeResult([INBOX_ID]), FakeResult(rows)]
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    def sql(self, index: int) -> str:
+        return str(self.statements[index].compile(dialect=postgresql.dialect()))
+
+
+def _events(count: int) -> list[WebhookEvent]:
+    return [
+        WebhookEvent(
+            id=uuid.uuid4(),
+            inbox_id=INBOX_ID,
+            method="POST",
+            headers={},
+            body={"n": n},
+            query_params={},
+            source_ip="203.0.113.7",
+            received_at=NOW - timedelta(seconds=n),
+        )
+        for n in range(count)
+    ]
+
+
+def test_cursor_round_trip():
+    event_id = uuid.uuid4()
+    assert _decode_event_cursor(_encode_event_cursor(NOW, event_id)) == (NOW, event_id)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm8tc2VwYXJhdG9y", "YXxi"])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_event_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_cursor_page_has_no_total():
+    events = _events(3)
+    db = FakeSession(events)
+    cursor = _encode_event_cursor(NOW + timedelta(minutes=1), uuid.uuid4())
+
+    page = await list_events("inbox", limit=2, offset=0, cursor=cursor, db=db, _key=None)
+
+    assert [item.id for item in page["data"]] == [event.id for event in events[:2]]
+    assert page["meta"]["total"] is None
+    assert page["meta"]["next_cursor"] == _encode_event_cursor(
+        events[1].received_at, events[1].id
+    )
+    sql = db.sql(1)
+    assert "count(" not in sql
+    assert "(webhook_events.received_at, webhook_events.id) <" in sql
+
+
+@pytest.mark.anyio
+async def test_last_cursor_page_has_no_next_cursor():
+    db = FakeSession(_events(2))
+    cursor = _encode_event_cursor(NOW + timedelta(minutes=1), uuid.uuid4())
+
+    page = await list_events("inbox", limit=2, offset=0, cursor=cursor, db=db, _key=None)
+
+    assert len(page["data"]) == 2
+    assert "next_cursor" not in page["meta"]
+
+
+class _CountedRow:
+    def __init__(self, event, total):
+        self.WebhookEvent = event
+        self.total = total
+
+
+@pytest.mark.anyio
+async def test_offset_page_counts_in_the_same_query():
+    events = _events(2)
+    db = FakeSession([_CountedRow(event, 5) for event in events])
+
+    page = await list_events("inbox", limit=2, offset=0, cursor=None, db=db, _key=None)
+
+    assert page["meta"]["total"] == 5
+    assert page["meta"]["next_cursor"] == _encode_event_cursor(
+        events[1].received_at, events[1].id
+    )
+    assert "count(*) OVER ()" in db.sql(1)
+    assert len(db.statements) == 2
@@ -0,0 +1,75 @@
+from email import message_from_bytes
+from email.header import decode_header, make_header
+
+from app.providers.message import build_message
+
+
+def _header_lines(raw: bytes) -> list[str]:
+    head, _, _ = raw.partition(b"\r\n\r\n")
+    return head.decode("ascii").split("\r\n")
+
+
+def test_builds_parseable_message():
+    raw = build_message("to@example.com", "from@example.com", "Acme", "Hello", "<p>Hi</p>")
+    msg = message_from_bytes(raw)
+
+    assert msg["To"] == "to@example.com"
+    assert msg["From"] == "Acme <from@example.com>"
+    assert msg["Subject"] == "Hello"
+    assert msg.get_content_type() == "text/html"
+    assert msg.get_payload(decode=True) == b"<p>Hi</p>"
+
+
+def test_plain_text_body():
+    raw = build_message("to@example.com", "from@example.com", "Acme", "Hi", "body", html=False)
+    assert message_from_bytes(raw).get_content_type() == "text/plain"
+
+
+def test_cr_lf_in_header_values_cannot_add_headers():
+    raw = build_message(
+        "to@example.com\r\nBcc: victim@example.com",
+        "from@example.com",
+        "Acme\nX-Display: 1",
+        "Hi\r\nX-Injected: yes",
+        "body",
+    )
+    names = [line.split(":", 1)[0] for line in _header_lines(raw)]
+
+    assert names == [
+        "To",
+        "From",
+        "Subject",
+        "MIME-Version",
+        "Content-Type",
+        "Content-Transfer-Encoding",
+    ]
+    assert message_from_bytes(raw)["Subject"] == "Hi  X-Injected: yes"
+
+
+def test_non_ascii_subject_is_encoded():
+    raw = build_message("to@example.com", "from@example.com", "Acme", "Grüße ✓", "body")
+    subject_line = next(line for line in _header_lines(raw) if line.startswith("Subject:"))
+
+    assert subject_line.startswith("Subject: =?utf-8?")
+    subject = message_from_bytes(raw)["Subject"]
+    assert str(make_header(decode_header(subject))) == "Grüße ✓"
+
+
+def test_cc_and_bcc_are_optional():
+    raw = build_message(
+        "to@example.com", "from@example.com", "Acme", "Hi", "body", cc="cc@example.com"
+    )
+    msg = message_from_bytes(raw)
+
+    assert msg["Cc"] == "cc@example.com"
+    assert msg["Bcc"] is None
+
+
+def test_long_encoded_header_folds_with_crlf():
+    raw = build_message("to@example.com", "from@example.com", "Acme", "Grüße " * 30, "body")
+    head, _, _ = raw.partition(b"\r\n\r\n")
+
+    assert b"\r\n " in head
+    assert head.count(b"\n") == head.count(b"\r\n")
+    subject = message_from_bytes(raw)["Subject"]
+    assert str(make_header(decode_header(subject))) == "Grüße " * 30
@@ -0,0 +1,117 @@
+import pytest
+from app import middleware
+from app.middleware import RateLimitMiddleware
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+LIMIT = RateLimitMiddleware.LIMIT
+WINDOW_US = RateLimitMiddleware.WINDOW_SECONDS * 1_000_000
+
+
+class FakeWindow:
+    """The sliding-window script over in-memory sorted lists of microsecond scores."""
+
+    def __init__(self):
+        self.entries: dict[str, list[int]] = {}
+        self.calls = 0
+
+    async def __call__(self, keys, args):
+        self.calls += 1
+        window_start, now, _ttl, limit = args
+        entries = [score for score in self.entries.get(keys[0], []) if score > window_start]
+        count = len(entries)
+        frees = entries[count - limit] if count >= limit else 0
+        self.entries[keys[0]] = entries + [now]
+        return [count, frees]
+
+
+class Clock:
+    def __init__(self):
+        self.us = 1_700_000_000 * 1_000_000
+
+    def time_ns(self):
+        return self.us * 1000
+
+
+@pytest.fixture
+def window(monkeypatch):
+    fake = FakeWindow()
+    monkeypatch.setattr(middleware, "_rate_script", fake)
+    middleware._blocked_until.clear()
+    yield fake
+    middleware._blocked_until.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(middleware.time, "time_ns", fake.time_ns)
+    return fake
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"))])
+    app.add_middleware(RateLimitMiddleware)
+    return TestClient(app)
+
+
+def _get(client, ip="198.51.100.1"):
+    return client.get("/", headers={"X-Forwarded-For": ip})
+
+
+def test_admits_up_to_the_limit(window, clock, client):
+    for n in range(LIMIT):
+        response = _get(client)
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Remaining"] == str(LIMIT - n - 1)
+        clock.us += 1000
+
+    assert _get(client).status_code == 429
+
+
+def test_over_limit_ip_is_refused_locally_until_a_slot_frees(window, clock, client):
+    first_hit = clock.us
+    for _ in range(LIMIT):
+        _get(client)
+        clock.us += 1000
+
+    refused = _get(client)
+    assert refused.status_code == 429
+    frees_at = first_hit // 1_000_000 + RateLimitMiddleware.WINDOW_SECONDS
+    assert refused.headers["X-RateLimit-Reset"] == str(frees_at)
+
+    calls = window.calls
+    clock.us = first_hit + WINDOW_US - 1000
+    assert _get(client).status_code == 429
+    assert window.calls == calls  # answered without the shared window
+
+    # Other IPs are unaffected
+    assert _get(client, ip="198.51.100.2").status_code == 200
+
+    # Once the oldest hit leaves the window, the shared window decides again
+    clock.us = first_hit + WINDOW_US + 1000
+    assert _get(client).status_code == 200
+    assert window.calls == calls + 2
+
+
+def test_local_cache_never_admits(window, clock, client):
+    # Another process filled the shared window; this one has never seen the IP
+    window.entries["ratelimit:198.51.100.1"] = [clock.us - n for n in range(LIMIT)]
+
+    assert _get(client).status_code == 429
+    assert "198.51.100.1" in middleware._blocked_until
+
+
+def test_redis_failure_fails_closed(monkeypatch, client):
+    async def unavailable(keys, args):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(middleware, "_rate_script", unavailable)
+    middleware._blocked_until.clear()
+
+    assert _get(client).status_code == 503
+    # /health bypasses the limiter (404: the test app has no such route)
+    assert client.get("/health").status_code == 404
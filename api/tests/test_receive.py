@@ -0,0 +1,18 @@
+import orjson
+from app.routers.webhooks import _without_nul
+
+
+def test_without_nul_strips_keys_values_and_nested_strings():
+    raw = b'{"na\\u0000me": "A\\u0000da", "tags": ["x\\u0000", 1, null], "n": {"k": "\\u0000"}}'
+
+    assert _without_nul(orjson.loads(raw)) == {
+        "name": "Ada",
+        "tags": ["x", 1, None],
+        "n": {"k": ""},
+    }
+
+
+def test_without_nul_leaves_other_values_alone():
+    body = {"count": 3, "ok": True, "text": "back\\slash u0000"}
+
+    assert _without_nul(body) == body
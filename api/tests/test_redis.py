@@ -0,0 +1,83 @@
+import pytest
+from app import redis as app_redis
+from app.redis import window_exceeded
+
+
+class FakeCounter:
+    """incr_window and PTTL over an in-memory fixed window."""
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+        self.ttl_ms = 0
+        self.calls = 0
+
+    async def incr_window(self, keys, args):
+        self.calls += 1
+        self.counts[keys[0]] = self.counts.get(keys[0], 0) + 1
+        return self.counts[keys[0]]
+
+    async def pttl(self, key):
+        self.calls += 1
+        return self.ttl_ms
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    fake = FakeCounter()
+    monkeypatch.setattr(app_redis, "incr_window", fake.incr_window)
+    monkeypatch.setattr(app_redis, "redis", fake)
+    app_redis._saturated.clear()
+    yield fake
+    app_redis._saturated.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(app_redis.time, "monotonic", fake.monotonic)
+    return fake
+
+
+@pytest.mark.anyio
+async def test_counts_hits_up_to_the_limit(counter, clock):
+    results = [await window_exceeded("k", limit=3, window=600) for _ in range(4)]
+
+    assert results == [False, False, False, True]
+
+
+@pytest.mark.anyio
+async def test_saturated_window_is_answered_from_memory(counter, clock):
+    counter.ttl_ms = 120_000
+    for _ in range(4):
+        await window_exceeded("k", limit=3, window=600)
+    calls = counter.calls
+
+    clock.now += 119
+    assert await window_exceeded("k", limit=3, window=600) is True
+    assert counter.calls == calls
+
+    # Other keys still go to Redis
+    assert await window_exceeded("other", limit=3, window=600) is False
+
+    # Once the window has ended, Redis is asked again
+    counter.counts.clear()
+    clock.now += 2
+    assert await window_exceeded("k", limit=3, window=600) is False
+    assert "k" not in app_redis._saturated
+
+
+@pytest.mark.anyio
+async def test_missing_ttl_falls_back_to_the_window(counter, clock):
+    counter.ttl_ms = -1
+    for _ in range(2):
+        await window_exceeded("k", limit=1, window=600)
+
+    assert app_redis._saturated["k"] == clock.now + 600
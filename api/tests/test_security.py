@@ -0,0 +1,161 @@
+import httpcore
+import httpx
+import pytest
+from app import security
+from app.security import SSRFSafeTransport, _is_ip_blocked
+
+PUBLIC_IP = "93.184.216.34"
+PUBLIC_IP_2 = "93.184.216.35"
+
+_OK_RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+
+
+@pytest.mark.parametrize(
+    ("ip", "blocked"),
+    [
+        ("10.0.0.0", True),
+        ("10.255.255.255", True),
+        ("11.0.0.0", False),
+        ("172.16.0.1", True),
+        ("172.32.0.1", False),
+        ("127.0.0.1", True),
+        ("169.254.169.254", True),
+        ("0.0.0.0", True),
+        ("8.8.8.8", False),
+        ("::1", True),
+        ("::2", False),
+        ("fd00::1", True),
+        ("fe80::1", True),
+        ("2606:4700::1111", False),
+        ("not-an-ip", True),
+    ],
+)
+def test_is_ip_blocked(ip, blocked):
+    assert _is_ip_blocked(ip) is blocked
+
+
+class FakeNetwork(httpcore.AsyncNetworkBackend):
+    """Records connect attempts; refuses the given addresses."""
+
+    def __init__(self, refused=()):
+        self.connects: list[str] = []
+        self.refused = set(refused)
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connects.append(host)
+        if host in self.refused:
+            raise httpcore.ConnectError(f"refused: {host}")
+        return httpcore.AsyncMockStream([_OK_RESPONSE] * 10)
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise NotImplementedError
+
+    async def sleep(self, seconds):
+        pass
+
+
+@pytest.fixture
+def dns(monkeypatch):
+    """Hostname -> addresses served to the SSRF check instead of real DNS."""
+    answers: dict[str, list[str]] = {}
+
+    async def fake_resolve(hostname):
+        addresses = answers.get(hostname)
+        if addresses is None:
+            return None
+        return any(_is_ip_blocked(a) for a in addresses), tuple(addresses)
+
+    monkeypatch.setattr(security, "_resolve", fake_resolve)
+    return answers
+
+
+def _client(network: FakeNetwork) -> httpx.AsyncClient:
+    transport = SSRFSafeTransport()
+    transport._pool._network_backend._backend = network
+    return httpx.AsyncClient(transport=transport)
+
+
+@pytest.mark.anyio
+async def test_connects_to_checked_address_by_hostname(dns):
+    dns["hooks.example"] = [PUBLIC_IP]
+    network = FakeNetwork()
+
+    async with _client(network) as client:
+        response = await client.get("http://hooks.example/path")
+
+    assert response.text == "ok"
+    assert response.request.url.host == "hooks.example"
+    assert network.connects == [PUBLIC_IP]
+
+
+@pytest.mark.anyio
+async def test_hostnames_sharing_an_ip_get_separate_connections(dns):
+    dns["a.example"] = [PUBLIC_IP]
+    dns["b.example"] = [PUBLIC_IP]
+    network = FakeNetwork()
+
+    async with _client(network) as client:
+        await client.get("http://a.example/")
+        await client.get("http://a.example/")
+        await client.get("http://b.example/")
+
+    # The pool is keyed by hostname: a.example's connection is reused for
+    # a.example only, and b.example gets its own
+    assert network.connects == [PUBLIC_IP, PUBLIC_IP]
+
+
+@pytest.mark.anyio
+async def test_falls_back_through_resolved_addresses(dns):
+    dns["hooks.example"] = [PUBLIC_IP, PUBLIC_IP_2]
+    network = FakeNetwork(refused=[PUBLIC_IP])
+
+    async with _client(network) as client:
+        response = await client.get("http://hooks.example/")
+
+    assert response.status_code == 200
+    assert network.connects == [PUBLIC_IP, PUBLIC_IP_2]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("url", "addresses"),
+    [
+        ("http://internal.example/", ["10.0.0.5"]),
+        ("http://mixed.example/", [PUBLIC_IP, "127.0.0.1"]),
+        ("http://unresolvable.example/", None),
+        ("http://metadata.google.internal/", [PUBLIC_IP]),
+    ],
+)
+async def test_refuses_blocked_destinations(dns, url, addresses):
+    host = httpx.URL(url).host
+    if addresses is not None:
+        dns[host] = addresses
+    network = FakeNetwork()
+
+    async with _client(network) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get(url)
+
+    assert network.connects == []
+
+
+@pytest.mark.anyio
+async def test_redirects_are_checked_per_hop(dns):
+    dns["hooks.example"] = [PUBLIC_IP]
+    dns["internal.example"] = ["10.0.0.5"]
+    redirect = (
+        b"HTTP/1.1 302 Found\r\nLocation: http://internal.example/\r\n"
+        b"Content-Length: 0\r\n\r\n"
+    )
+
+    class RedirectingNetwork(FakeNetwork):
+        async def connect_tcp(self, host, port, **kwargs):
+            self.connects.append(host)
+            return httpcore.AsyncMockStream([redirect])
+
+    network = RedirectingNetwork()
+    async with _client(network) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://hooks.example/", follow_redirects=True)
+
+    assert network.connects == [PUBLIC_IP]